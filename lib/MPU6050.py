@@ -4,8 +4,11 @@
 # and https://github.com/CoreElectronics/CE-PiicoDev-MPU6050-MicroPython-Module
 
 from math import sqrt, atan2
-from machine import Pin, SoftI2C
-from time import sleep_ms
+from machine import Pin, I2C, SoftI2C
+from time import sleep_ms, ticks_us
+from array import array
+import struct
+import json
 from typing import Literal
 
 error_msg = "\nError \n"
@@ -48,8 +51,46 @@ _GYRO_XOUT0 = 0x43
 _ACCEL_CONFIG = 0x1C
 _GYRO_CONFIG = 0x1B
 
+_XA_OFFS_H = 0x06     # accel offsets X, Y, Z (factory trim), 2 bytes each
+_XG_OFFS_USRH = 0x13  # gyro offsets X, Y, Z, 2 bytes each
+
+_SMPLRT_DIV = 0x19
+_CONFIG = 0x1A
+_FIFO_EN = 0x23
+_INT_PIN_CFG = 0x37
+_INT_ENABLE = 0x38
+_INT_STATUS = 0x3A
+_USER_CTRL = 0x6A
+_FIFO_COUNTH = 0x72
+_FIFO_R_W = 0x74
+
+# FIFO_EN register bits
+_FIFO_TEMP = 0x80
+_FIFO_GYRO = 0x70  # XG, YG and ZG
+_FIFO_ACCEL = 0x08
+
+# USER_CTRL register bits
+_USER_FIFO_EN = 0x40
+_USER_FIFO_RESET = 0x04
+
+# INT_ENABLE / INT_STATUS register bits
+_INT_FIFO_OFLOW = 0x10
+_INT_DATA_RDY = 0x01
+
+_FIFO_SIZE = 1024
+
+# Offset register units
+_ACC_OFFS_LSB_G = 2048.0     # accel offsets are in +-16g units
+_GYR_OFFS_LSB_DPS = 32.8     # gyro offsets are in +-1000deg/s units
+_OFFSETS_FILE = "mpu6050_offsets.json"
+
 _maxFails = 3
 
+# Burst read: ACCEL_XOUT_H (0x3B) up to and including GYRO_ZOUT_L (0x48)
+_BURST_LEN = 14
+_BURST_FMT = ">7h"
+_NAN7 = (float("NaN"),) * 7
+
 # Address
 _MPU6050_ADDRESS = 0x68
 def signedIntFromBytes(x: bytes, endian: Literal['little', 'big'] = "big"):
@@ -62,24 +103,45 @@ def signedIntFromBytes(x: bytes, endian: Literal['little', 'big'] = "big"):
     
 
 class MPU6050(object):     
-    def __init__(self, bus=None, freq=None, sda=None, scl=None, addr=_MPU6050_ADDRESS):
+    # offsets_file : offsets saved by calibrate() that are written to the chip at start-up
+    def __init__(self, bus=None, freq=None, sda=None, scl=None, addr=_MPU6050_ADDRESS, offsets_file=None):
         # Checks any erorr would happen with I2C communication protocol.
         self._failCount = 0
         self._terminatingFailCount = 0
         
-        # Initializing the I2C method for ESP32
-        # Pin assignment:
-        # SCL -> GPIO 22
-        # SDA -> GPIO 21
-        self.i2c = SoftI2C(scl=Pin(22), sda=Pin(21), freq=100000)
-        
-        # Initializing the I2C method for ESP8266
-        # Pin assignment:
-        # SCL -> GPIO 5
-        # SDA -> GPIO 4
-        # self.i2c = I2C(scl=Pin(5), sda=Pin(4))
+        # I2C bus selection
+        # bus = I2C object : use the given bus (it can be shared with other devices)
+        # bus = 0 or 1     : hardware I2C with that id, 400 kHz unless freq is given,
+        #                    on the sda/scl pins when given
+        # bus = None       : SoftI2C on sda/scl, defaults for ESP32:
+        #                    SCL -> GPIO 22, SDA -> GPIO 21, 100 kHz
+        if bus is None:
+            self.i2c = SoftI2C(scl=Pin(22 if scl is None else scl),
+                               sda=Pin(21 if sda is None else sda),
+                               freq=100000 if freq is None else freq)
+        elif isinstance(bus, int):
+            if sda is None or scl is None:
+                self.i2c = I2C(bus, freq=400000 if freq is None else freq)
+            else:
+                self.i2c = I2C(bus, scl=Pin(scl), sda=Pin(sda),
+                               freq=400000 if freq is None else freq)
+        else:
+            self.i2c = bus
         
         self.addr = addr
+        self._burst_buf = bytearray(_BURST_LEN)
+        self._axis_buf = bytearray(6)
+        self._reg_buf = bytearray(2)
+        self._fifo_buf = None
+        self._fifo_channels = 0
+        self.fifo_rate = 0
+        self.fifo_overflows = 0
+        self.sample_rate = 0
+        self.sample = array('h', [0] * 7)
+        self.sample_us = 0
+        self.samples_ready = 0
+        self._int_pin = None
+        self._drdy_callback = None
         try:
             # Wake up the MPU-6050 since it starts in sleep mode
             self.i2c.writeto_mem(self.addr, _PWR_MGMT_1, bytes([0x00]))
@@ -90,6 +152,9 @@ class MPU6050(object):
             raise e
         self._accel_range = self.get_accel_range(True)
         self._gyro_range = self.get_gyro_range(True)
+        self._update_scales()
+        if offsets_file is not None:
+            self.load_offsets(offsets_file)
 
     def _readData(self, register):
         failCount = 0
@@ -127,6 +192,7 @@ class MPU6050(object):
     def set_accel_range(self, accel_range):
         self.i2c.writeto_mem(self.addr, _ACCEL_CONFIG, bytes([accel_range]))
         self._accel_range = accel_range
+        self._update_scales()
 
     # Gets the range the accelerometer is set to.
     # raw=True: Returns raw value from the ACCEL_CONFIG register
@@ -149,35 +215,39 @@ class MPU6050(object):
             else:
                 return -1
 
-    # Reads and returns the AcX, AcY and AcZ values from the accelerometer.
-    # Returns dictionary data in g or m/s^2 (g=False)
-    def read_accel_data(self, g = False):         
-        accel_data = self._readData(_ACCEL_XOUT0)
+    # Returns the LSB per g for the current accelerometer range.
+    def _accel_scaler(self):
         accel_range = self._accel_range
-        scaler = None
         if accel_range == _ACC_RNG_2G:
-            scaler = _ACC_SCLR_2G
+            return _ACC_SCLR_2G
         elif accel_range == _ACC_RNG_4G:
-            scaler = _ACC_SCLR_4G
+            return _ACC_SCLR_4G
         elif accel_range == _ACC_RNG_8G:
-            scaler = _ACC_SCLR_8G
+            return _ACC_SCLR_8G
         elif accel_range == _ACC_RNG_16G:
-            scaler = _ACC_SCLR_16G
-        else:
-            print("Unkown range - scaler set to _ACC_SCLR_2G")
-            scaler = _ACC_SCLR_2G
+            return _ACC_SCLR_16G
+        print("Unkown range - scaler set to _ACC_SCLR_2G")
+        return _ACC_SCLR_2G
 
-        x = accel_data["x"] / scaler
-        y = accel_data["y"] / scaler
-        z = accel_data["z"] / scaler
+    # Precomputes the raw-to-unit multipliers, called whenever a range is set,
+    # so the read functions do not have to look up the scaler on every call.
+    def _update_scales(self):
+        acc = self._accel_scaler()
+        self._accel_scale_g = 1 / acc
+        self._accel_scale_ms2 = _GRAVITIY_MS2 / acc
+        self._gyro_scale = 1 / self._gyro_scaler()
 
-        if g is True:
-            return {"x": x, "y": y, "z": z}
-        elif g is False:
-            x = x * _GRAVITIY_MS2
-            y = y * _GRAVITIY_MS2
-            z = z * _GRAVITIY_MS2
-            return {"x": x, "y": y, "z": z}
+    # Reads and returns the AcX, AcY and AcZ values from the accelerometer.
+    # Returns dictionary data in g or m/s^2 (g=False)
+    def read_accel_data(self, g = False):         
+        accel_data = self._readData(_ACCEL_XOUT0)
+        scale = self._accel_scale_g if g is True else self._accel_scale_ms2
+
+        x = accel_data["x"] * scale
+        y = accel_data["y"] * scale
+        z = accel_data["z"] * scale
+
+        return {"x": x, "y": y, "z": z}
 
     def read_accel_abs(self, g=False):
         d = self.read_accel_data(g)
@@ -192,6 +262,7 @@ class MPU6050(object):
     def set_gyro_range(self, gyro_range):
         self.i2c.writeto_mem(self.addr, _GYRO_CONFIG, bytes([gyro_range]))
         self._gyro_range = gyro_range
+        self._update_scales()
 
     # Gets the range the gyroscope is set to.
     # raw=True: return raw value from GYRO_CONFIG register
@@ -214,30 +285,127 @@ class MPU6050(object):
             else:
                 return -1
 
-    # Gets and returns the GyX, GyY and GyZ values from the gyroscope.
-    # Returns the read values in a dictionary.
-    def read_gyro_data(self):
-        gyro_data = self._readData(_GYRO_XOUT0)
+    # Returns the LSB per deg/s for the current gyroscope range.
+    def _gyro_scaler(self):
         gyro_range = self._gyro_range
-        scaler = None
         if gyro_range == _GYR_RNG_250DEG:
-            scaler = _GYR_SCLR_250DEG
+            return _GYR_SCLR_250DEG
         elif gyro_range == _GYR_RNG_500DEG:
-            scaler = _GYR_SCLR_500DEG
+            return _GYR_SCLR_500DEG
         elif gyro_range == _GYR_RNG_1000DEG:
-            scaler = _GYR_SCLR_1000DEG
+            return _GYR_SCLR_1000DEG
         elif gyro_range == _GYR_RNG_2000DEG:
-            scaler = _GYR_SCLR_2000DEG
-        else:
-            print("Unkown range - scaler set to _GYR_SCLR_250DEG")
-            scaler = _GYR_SCLR_250DEG
+            return _GYR_SCLR_2000DEG
+        print("Unkown range - scaler set to _GYR_SCLR_250DEG")
+        return _GYR_SCLR_250DEG
+
+    # Gets and returns the GyX, GyY and GyZ values from the gyroscope.
+    # Returns the read values in a dictionary.
+    def read_gyro_data(self):
+        gyro_data = self._readData(_GYRO_XOUT0)
+        scale = self._gyro_scale
 
-        x = gyro_data["x"] / scaler
-        y = gyro_data["y"] / scaler
-        z = gyro_data["z"] / scaler
+        x = gyro_data["x"] * scale
+        y = gyro_data["y"] * scale
+        z = gyro_data["z"] * scale
 
         return {"x": x, "y": y, "z": z}
 
+    # Reads accelerometer, temperature and gyroscope registers (0x3B-0x48) in
+    # one 14-byte burst without any delay.
+    # Returns the raw signed values as a tuple (ax, ay, az, temp, gx, gy, gz).
+    def read_raw_all(self):
+        if self._read_into(_ACCEL_XOUT0, self._burst_buf):
+            return struct.unpack_from(_BURST_FMT, self._burst_buf)
+        return _NAN7
+
+    # Reads all seven channels with a single burst read.
+    # Returns a tuple (ax, ay, az, temp, gx, gy, gz): acceleration in g or m/s^2 (g=False),
+    # temperature in degC and rotation in deg/s.
+    def read_all(self, g = False):
+        ax, ay, az, t, gx, gy, gz = self.read_raw_all()
+        acc = self._accel_scale_g if g is True else self._accel_scale_ms2
+        gyr = self._gyro_scale
+        return (ax * acc, ay * acc, az * acc, t / 340 + 36.53, gx * gyr, gy * gyr, gz * gyr)
+
+    # Allocation-free reads. These fill caller-provided arrays instead of
+    # returning new dictionaries or tuples; buffers are created once, e.g.
+    #   raw = array('h', [0] * 7)   or   data = array('f', [0] * 7)
+    # Channel order is the register order: ax, ay, az, temp, gx, gy, gz.
+    # Each returns False (and leaves buf untouched) when the I2C read failed.
+
+    # Reads register data into buf with retries, without sleeping.
+    def _read_into(self, register, buf):
+        failCount = 0
+        while failCount < _maxFails:
+            try:
+                self.i2c.readfrom_mem_into(self.addr, register, buf)
+                return True
+            except:
+                failCount = failCount + 1
+                self._failCount = self._failCount + 1
+        self._terminatingFailCount = self._terminatingFailCount + 1
+        print(i2c_err_str.format(self.addr))
+        return False
+
+    # Fills buf (array('h'), 7 entries) with the raw signed register values.
+    def read_raw_into(self, buf):
+        data = self._burst_buf
+        if not self._read_into(_ACCEL_XOUT0, data):
+            return False
+        for i in range(7):
+            v = (data[2 * i] << 8) | data[2 * i + 1]
+            if v & 0x8000:
+                v -= 0x10000
+            buf[i] = v
+        return True
+
+    # Fills buf (array('f'), 7 entries) with acceleration in g or m/s^2 (g=False),
+    # temperature in degC and rotation in deg/s.
+    def read_all_into(self, buf, g = False):
+        data = self._burst_buf
+        if not self._read_into(_ACCEL_XOUT0, data):
+            return False
+        acc = self._accel_scale_g if g is True else self._accel_scale_ms2
+        gyr = self._gyro_scale
+        for i in range(7):
+            v = (data[2 * i] << 8) | data[2 * i + 1]
+            if v & 0x8000:
+                v -= 0x10000
+            if i < 3:
+                buf[i] = v * acc
+            elif i == 3:
+                buf[i] = v / 340 + 36.53
+            else:
+                buf[i] = v * gyr
+        return True
+
+    # Fills buf[0:3] (array('f')) with the acceleration in g or m/s^2 (g=False).
+    def read_accel_into(self, buf, g = False):
+        data = self._axis_buf
+        if not self._read_into(_ACCEL_XOUT0, data):
+            return False
+        scale = self._accel_scale_g if g is True else self._accel_scale_ms2
+        for i in range(3):
+            v = (data[2 * i] << 8) | data[2 * i + 1]
+            if v & 0x8000:
+                v -= 0x10000
+            buf[i] = v * scale
+        return True
+
+    # Fills buf[0:3] (array('f')) with the rotation in deg/s.
+    def read_gyro_into(self, buf):
+        data = self._axis_buf
+        if not self._read_into(_GYRO_XOUT0, data):
+            return False
+        scale = self._gyro_scale
+        for i in range(3):
+            v = (data[2 * i] << 8) | data[2 * i + 1]
+            if v & 0x8000:
+                v -= 0x10000
+            buf[i] = v * scale
+        return True
+
     def read_angle(self): # returns radians. orientation matches silkscreen
         a = self.read_accel_data()
         # If read_accel_data failed or returned None or invalid data, return NaN angles
@@ -255,3 +423,210 @@ class MPU6050(object):
             return {"x": x, "y": y}
         except Exception:
             return {"x": float("NaN"), "y": float("NaN")}
+
+    # Sets the sample rate and the digital low pass filter.
+    # rate_hz : sample rate, rounded to what the sample rate divider allows
+    # dlpf    : digital low pass filter setting 0-6 (0 = off, 8 kHz gyro rate)
+    # Returns the actual sample rate in Hz.
+    def set_sample_rate(self, rate_hz, dlpf=1):
+        base = 8000 if (dlpf & 7) in (0, 7) else 1000
+        div = max(0, min(255, base // rate_hz - 1))
+        self.i2c.writeto_mem(self.addr, _CONFIG, bytes([dlpf & 7]))
+        self.i2c.writeto_mem(self.addr, _SMPLRT_DIV, bytes([div]))
+        self.sample_rate = base / (1 + div)
+        return self.sample_rate
+
+    # Starts FIFO acquisition.
+    # rate_hz : sample rate, rounded to what the sample rate divider allows
+    # dlpf    : digital low pass filter setting 0-6 (0 = off, 8 kHz gyro rate)
+    # accel, temp, gyro : channels written to the FIFO. Each sample in the FIFO
+    # holds the enabled channels in the order ax, ay, az, temp, gx, gy, gz.
+    def fifo_start(self, rate_hz=1000, dlpf=1, accel=True, gyro=True, temp=False):
+        self.fifo_rate = self.set_sample_rate(rate_hz, dlpf)
+
+        enable = 0
+        channels = 0
+        if accel:
+            enable |= _FIFO_ACCEL
+            channels += 3
+        if temp:
+            enable |= _FIFO_TEMP
+            channels += 1
+        if gyro:
+            enable |= _FIFO_GYRO
+            channels += 3
+        self._fifo_channels = channels
+        frame = 2 * channels
+        self._fifo_buf = bytearray((_FIFO_SIZE // frame) * frame)
+        self.fifo_overflows = 0
+
+        self.i2c.writeto_mem(self.addr, _FIFO_EN, bytes([enable]))
+        self._fifo_reset()
+
+    # Stops writing samples to the FIFO.
+    def fifo_stop(self):
+        self.i2c.writeto_mem(self.addr, _FIFO_EN, bytes([0]))
+        self.i2c.writeto_mem(self.addr, _USER_CTRL, bytes([0]))
+
+    def _fifo_reset(self):
+        self.i2c.writeto_mem(self.addr, _USER_CTRL, bytes([_USER_FIFO_RESET]))
+        self.i2c.writeto_mem(self.addr, _USER_CTRL, bytes([_USER_FIFO_EN]))
+
+    # Returns the number of bytes waiting in the FIFO.
+    def fifo_count(self):
+        buf = self._reg_buf
+        self.i2c.readfrom_mem_into(self.addr, _FIFO_COUNTH, buf)
+        return (buf[0] << 8) | buf[1]
+
+    # Moves complete samples from the FIFO into out, an array('h') that is filled
+    # with the raw channel values one sample after the other.
+    # Returns the number of samples read, 0 when fifo_start() was not called.
+    # After a FIFO overflow the FIFO is reset, fifo_overflows is incremented and
+    # 0 is returned. Overflow is detected from the byte count (a full FIFO), not
+    # from INT_STATUS, so the data-ready interrupt flags are left alone and
+    # start_data_ready() can run at the same time.
+    def fifo_read(self, out):
+        channels = self._fifo_channels
+        if channels == 0:
+            return 0
+        frame = 2 * channels
+        count = self.fifo_count()
+        if count >= _FIFO_SIZE:
+            # Full: old samples are (about to be) overwritten and the frame
+            # alignment is lost
+            self.fifo_overflows += 1
+            self._fifo_reset()
+            return 0
+
+        samples = min(count // frame, len(out) // channels)
+        fifo_buf = self._fifo_buf
+        per_read = len(fifo_buf) // frame
+        j = 0
+        done = 0
+        while done < samples:
+            n = min(per_read, samples - done)
+            nbytes = n * frame
+            if nbytes == len(fifo_buf):
+                self.i2c.readfrom_mem_into(self.addr, _FIFO_R_W, fifo_buf)
+            else:
+                self.i2c.readfrom_mem_into(self.addr, _FIFO_R_W, memoryview(fifo_buf)[:nbytes])
+            for i in range(0, nbytes, 2):
+                v = (fifo_buf[i] << 8) | fifo_buf[i + 1]
+                if v & 0x8000:
+                    v -= 0x10000
+                out[j] = v
+                j += 1
+            done += n
+        return samples
+
+    # Data-ready mode: the MPU6050 INT output is wired to int_pin. On every new
+    # sample the pin IRQ (scheduled, not hard) does one burst read into self.sample
+    # (array('h'), raw ax, ay, az, temp, gx, gy, gz), stores the ticks_us() time in
+    # sample_us, increments samples_ready and calls callback(sample) when given.
+    # The callback runs in IRQ context: keep it short and copy what it needs.
+    # fifo_read() does not touch INT_STATUS, so both can be used together.
+    def start_data_ready(self, int_pin, callback=None, rate_hz=None, dlpf=1):
+        if rate_hz is not None:
+            self.set_sample_rate(rate_hz, dlpf)
+        self._drdy_callback = callback
+        self._int_pin = Pin(int_pin, Pin.IN)
+        # INT active high, push-pull, 50 us pulse per sample
+        self.i2c.writeto_mem(self.addr, _INT_PIN_CFG, bytes([0x00]))
+        self.i2c.writeto_mem(self.addr, _INT_ENABLE, bytes([_INT_DATA_RDY]))
+        self._int_pin.irq(trigger=Pin.IRQ_RISING, handler=self._on_data_ready)
+
+    # Stops data-ready mode.
+    def stop_data_ready(self):
+        if self._int_pin is not None:
+            self._int_pin.irq(handler=None)
+            self._int_pin = None
+        self.i2c.writeto_mem(self.addr, _INT_ENABLE, bytes([0]))
+
+    def _on_data_ready(self, pin):
+        if self.read_raw_into(self.sample):
+            self.sample_us = ticks_us()
+            self.samples_ready += 1
+            if self._drdy_callback is not None:
+                self._drdy_callback(self.sample)
+
+    # Reads the accelerometer and gyroscope offset registers.
+    # Returns a list [ax, ay, az, gx, gy, gz] of signed register values.
+    def get_offsets(self):
+        offsets = []
+        for register in (_XA_OFFS_H, _XG_OFFS_USRH):
+            data = self.i2c.readfrom_mem(self.addr, register, 6)
+            for i in range(3):
+                offsets.append(signedIntFromBytes(data[2 * i:2 * i + 2]))
+        return offsets
+
+    # Writes the offset registers, the chip then returns corrected data.
+    # Bit 0 of the accel offsets is reserved (temperature compensation) and is kept.
+    def set_offsets(self, offsets):
+        current = self.i2c.readfrom_mem(self.addr, _XA_OFFS_H, 6)
+        data = bytearray(6)
+        for i in range(3):
+            v = (offsets[i] & 0xFFFE) | (current[2 * i + 1] & 0x01)
+            data[2 * i] = (v >> 8) & 0xFF
+            data[2 * i + 1] = v & 0xFF
+        self.i2c.writeto_mem(self.addr, _XA_OFFS_H, data)
+        for i in range(3):
+            v = offsets[3 + i] & 0xFFFF
+            data[2 * i] = v >> 8
+            data[2 * i + 1] = v & 0xFF
+        self.i2c.writeto_mem(self.addr, _XG_OFFS_USRH, data)
+
+    # Stores the current offset registers in a file on flash.
+    def save_offsets(self, path=_OFFSETS_FILE):
+        with open(path, "w") as f:
+            json.dump(self.get_offsets(), f)
+
+    # Writes offsets saved with save_offsets() to the chip.
+    # Returns False when there is no (valid) offsets file.
+    def load_offsets(self, path=_OFFSETS_FILE):
+        try:
+            with open(path) as f:
+                offsets = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if len(offsets) != 6:
+            return False
+        self.set_offsets(offsets)
+        return True
+
+    # Measures the sensor bias and compensates it in the chip's offset registers.
+    # The sensor must lie still; gravity is the expected accelerometer reading in g
+    # (default: level with Z up). Averages `samples` burst reads per iteration, a
+    # second iteration removes the rounding left by the first.
+    # path : file to save the offsets to (None = do not save)
+    # Returns the new offsets [ax, ay, az, gx, gy, gz].
+    def calibrate(self, samples=500, gravity=(0, 0, 1), iterations=2, path=_OFFSETS_FILE):
+        raw = array('h', [0] * 7)
+        sums = array('f', [0.0] * 6)
+        offsets = self.get_offsets()
+        for _ in range(iterations):
+            for i in range(6):
+                sums[i] = 0.0
+            n = 0
+            for _ in range(samples):
+                if self.read_raw_into(raw):
+                    for i in range(3):
+                        sums[i] += raw[i]
+                        sums[3 + i] += raw[4 + i]
+                    n += 1
+                sleep_ms(2)
+            if n == 0:
+                raise OSError(i2c_err_str.format(self.addr))
+
+            for i in range(3):
+                bias_g = sums[i] / n * self._accel_scale_g - gravity[i]
+                offsets[i] -= int(round(bias_g * _ACC_OFFS_LSB_G)) & ~1
+                bias_dps = sums[3 + i] / n * self._gyro_scale
+                offsets[3 + i] -= int(round(bias_dps * _GYR_OFFS_LSB_DPS))
+            for i in range(6):
+                offsets[i] = max(-32768, min(32767, offsets[i]))
+            self.set_offsets(offsets)
+            sleep_ms(20)
+
+        if path is not None:
+            self.save_offsets(path)
+        return self.get_offsets()
@@ -29,81 +29,172 @@ while True:
 API Overview
 ============
 
-Class AS5048A(cs_pin=17, spi_id=0, baudrate=3000000)
-----------------------------------------------------
+Class AS5048A(cs_pin=17, spi_id=0, baudrate=3000000, vel_alpha=0.5, vel_beta=0.1)
+-----------------------------------------------------------------------------------
 Create a new AS5048A encoder instance.
 
 Parameters:
-    cs_pin   : GPIO pin number of chip select
-    spi_id   : SPI interface (0 or 1)
-    baudrate : SPI clock speed (default 3 MHz)
+    cs_pin    : GPIO pin number of chip select
+    spi_id    : SPI interface (0 or 1)
+    baudrate  : SPI clock speed (default 3 MHz)
+    vel_alpha : Position gain of the alpha-beta velocity estimator
+    vel_beta  : Velocity gain of the alpha-beta velocity estimator
 
 Properties (read-only):
+    raw              : Last raw 14-bit reading (0 - 16383)
+    count            : Continuous position in counts since the zero reference
     angle_deg        : Current angle 0–360°
     corrected_angle  : Angle minus start reference (tared)
     turns            : Integer number of full rotations
     total_angle      : Continuous angle (turns * 360 + corrected)
-    rpm              : Computed rotations per minute
+    velocity         : Estimated speed in counts/s (updated every sample)
+    velocity_dps     : Estimated speed in degrees/s
+    rpm              : Estimated rotations per minute
 
 Methods:
-    update()         : Reads the sensor + updates angle, turns & rpm
+    update()         : Reads the sensor + updates angle, turns & velocity
+    update_from_raw(raw, t_us=None) : Same as update() for an external reading
     read_raw()       : Reads raw 14-bit encoder value
     reset_zero()     : Sets current position as new zero reference
     set_start_angle(deg) : Manually set tare offset
+    set_lut(lut)     : Installs a 256-entry array('h') correction table
+    load_lut(path)   : Loads a correction table from flash
+    save_lut(path)   : Stores the current correction table on flash
+
+Pass spi=<SPI object> to share one bus between several encoders. With
+cs_pin=None the encoder does no reads of its own and is fed by a chain
+reader (see below); its first sample then becomes the zero reference.
+
+Class AS5048AChain(spi, encoders, cs_pin=None, pipelined=False)
+---------------------------------------------------------------
+Reads several encoders on one SPI bus and updates every encoder object.
+
+    cs_pin given : Daisy-chain mode, all sensors share this chip select and
+                   are read in one burst of 2 bytes per sensor. encoders are
+                   listed in the order their frames come out on MISO (the
+                   sensor wired to the Pico MISO first).
+    cs_pin None  : Grouped mode, every encoder keeps its own chip select and
+                   the sensors are read back to back in one pass.
+    pipelined    : Skip the command burst and use the answer to the previous
+                   read (one sample old), halving the SPI traffic.
+
+    read()       : Reads all sensors into .raw (array('H')) and updates them
+
+Class AS5048ASampler(encoder, rate_hz=1000, size=256, oversample=1, decimate=1)
+-------------------------------------------------------------------------------
+Samples an encoder from a hardware timer into a ring buffer of raw counts
+(array('H')) and ticks_us() timestamps (array('L')).
+
+    oversample   : Reads per timer tick, averaged
+    decimate     : Timer ticks per stored sample, averaged
+    start()      : Starts the timer
+    stop()       : Stops the timer
+    available()  : Number of samples waiting in the buffer
+    drain(raw_out, t_out) : Copies up to len(raw_out) samples, returns count
+    process()    : Feeds all waiting samples to encoder.update_from_raw()
+    overruns     : Samples dropped because the buffer was full
+
+calibrate_lut(encoder, stepper, revolutions=2, sps=400)
+--------------------------------------------------------
+Sweeps the axis with a Stepper (encoder on the output axis) at a constant
+rate and builds the nonlinearity correction table from the difference
+between the stepper position and the encoder reading. The table holds the
+correction in counts at every 64th raw count and is applied in update()
+with integer linear interpolation.
+
+enc.set_lut(calibrate_lut(enc, s1))
+enc.save_lut()            # and at boot: enc.load_lut()
+
+Turn counting uses the shortest signed difference between two consecutive
+14-bit readings, so no turns are lost as long as the shaft moves less than
+half a revolution between two updates.
 """
 
-from machine import Pin, SPI
+from machine import Pin, SPI, Timer
+from array import array
 import time
 
+COUNTS_PER_REV = 16384
+_HALF_REV = 8192
+_COUNT_MASK = 0x3FFF
+_DEG_PER_COUNT = 360.0 / COUNTS_PER_REV
+
+LUT_SIZE = 256       # correction table entries, one every 64 counts
+_LUT_SHIFT = 6
+_LUT_FRAC = 0x3F
+LUT_FILE = "as5048a_lut.bin"
+
 
 class AS5048A:
     """Driver for AS5048A magnetic rotary encoder (SPI)."""
 
     READ_CMD = 0xFFFF  # Read command for AS5048A
 
-    def __init__(self, cs_pin=17, spi_id=0, baudrate=3000000):
-        # --- Chip Select pin ---
-        self.cs = Pin(cs_pin, Pin.OUT)
-        self.cs.value(1)
+    def __init__(self, cs_pin=17, spi_id=0, baudrate=3000000,
+                 vel_alpha=0.5, vel_beta=0.1, spi=None):
+        # --- Chip Select pin (None when driven by an AS5048AChain) ---
+        self.cs = None
+        if cs_pin is not None:
+            self.cs = Pin(cs_pin, Pin.OUT)
+            self.cs.value(1)
 
         # --- SPI interface ---
-        self.spi = SPI(
-            spi_id,
-            baudrate=baudrate,
-            polarity=1,
-            phase=1,
-            bits=8,
-            firstbit=SPI.MSB
-        )
+        if spi is None:
+            spi = SPI(
+                spi_id,
+                baudrate=baudrate,
+                polarity=1,
+                phase=1,
+                bits=8,
+                firstbit=SPI.MSB
+            )
+        self.spi = spi
+        self._tx = bytearray(2)
+        self._rx = bytearray(2)
 
         # --- State tracking ---
+        self.raw = 0
+        self.count = 0
         self.angle_deg = 0.0
         self.corrected_angle = 0.0
         self.start_angle = 0.0
         self.turns = 0
-        self.previous_quadrant = None
         self.total_angle = 0.0
 
-        # RPM tracking
-        self._rpm_timer = time.ticks_ms()
-        self._rpm_counter = 0
+        # Unwrapped position in counts and the count of the zero reference
+        self._pos = 0
+        self._zero = 0
+        self._last_raw = None
+
+        # Velocity tracking (alpha-beta filter, counts and counts/s)
+        self.vel_alpha = vel_alpha
+        self.vel_beta = vel_beta
+        self._last_us = 0
+        self._pos_err = 0.0  # estimated position minus measured position
+        self.velocity = 0.0
+        self.velocity_dps = 0.0
         self.rpm = 0.0
 
-        # Read initial angle
-        self.update()
-        self.start_angle = self.angle_deg
+        # Nonlinearity correction table (None = uncorrected)
+        self.lut = None
+
+        # Read initial angle, this also becomes the zero reference
+        if self.cs is not None:
+            self.update()
 
     # ------------------------------
     #  LOW-LEVEL SPI COMMUNICATION
     # ------------------------------
     def _transfer16(self, value):
         """Transfers a 16-bit command over SPI (big-endian)."""
-        buf = value.to_bytes(2, 'big')
+        tx = self._tx
+        rx = self._rx
+        tx[0] = value >> 8
+        tx[1] = value & 0xFF
         self.cs.value(0)
-        self.spi.write(buf)
-        rx = self.spi.read(2)
+        self.spi.write_readinto(tx, rx)
         self.cs.value(1)
-        return int.from_bytes(rx, 'big')
+        return (rx[0] << 8) | rx[1]
 
     def read_raw(self):
         """Reads raw 14-bit angle from AS5048A (0 - 16383)."""
@@ -113,76 +204,432 @@ class AS5048A:
         raw = self._transfer16(self.READ_CMD)
 
         # Mask top 2 bits (PAR + EF)
-        return raw & 0x3FFF
+        return raw & _COUNT_MASK
 
     # ------------------------------
     #  ANGLE PROCESSING
     # ------------------------------
-    def _compute_angle(self):
-        raw = self.read_raw()
-        self.angle_deg = (raw / 16384.0) * 360.0
-
-    def _compute_corrected(self):
-        self.corrected_angle = self.angle_deg - self.start_angle
-        if self.corrected_angle < 0:
-            self.corrected_angle += 360
-
-    def _quadrant(self, angle):
-        if 0 <= angle <= 90:
-            return 1
-        if 90 < angle <= 180:
-            return 2
-        if 180 < angle <= 270:
-            return 3
-        return 4
-
-    def _update_turns(self):
-        q = self._quadrant(self.corrected_angle)
-
-        if self.previous_quadrant is not None:
-            # 4 → 1 means CW
-            if q == 1 and self.previous_quadrant == 4:
-                self.turns += 1
-                self._rpm_counter += 1
-
-            # 1 → 4 means CCW
-            elif q == 4 and self.previous_quadrant == 1:
-                self.turns -= 1
-                self._rpm_counter -= 1
-
-        self.previous_quadrant = q
-
-    def _update_total_angle(self):
-        self.total_angle = self.turns * 360 + self.corrected_angle
+    def _linearize(self, raw):
+        """Applies the correction table with integer interpolation."""
+        lut = self.lut
+        i = raw >> _LUT_SHIFT
+        lo = lut[i]
+        hi = lut[(i + 1) & (LUT_SIZE - 1)]
+        return (raw + lo + (((hi - lo) * (raw & _LUT_FRAC)) >> _LUT_SHIFT)) & _COUNT_MASK
+
+    def _unwrap(self, raw):
+        """Adds the shortest signed step since the last reading to the position."""
+        if self._last_raw is None:
+            # First sample: start at zero turns with this angle as reference
+            self._pos = raw
+            self._zero = raw
+            self.start_angle = raw * _DEG_PER_COUNT
+            self._last_raw = raw
+            return 0
+
+        delta = (raw - self._last_raw) & _COUNT_MASK
+        if delta >= _HALF_REV:
+            delta -= COUNTS_PER_REV
+        self._pos += delta
+        self._last_raw = raw
+        return delta
+
+    def _update_angles(self):
+        rel = self._pos - self._zero
+        self.count = rel
+        self.turns = rel >> 14
+        self.angle_deg = self.raw * _DEG_PER_COUNT
+        self.corrected_angle = (rel & _COUNT_MASK) * _DEG_PER_COUNT
+        self.total_angle = rel * _DEG_PER_COUNT
 
     # ------------------------------
-    #  RPM CALCULATION
+    #  VELOCITY ESTIMATION
     # ------------------------------
-    def _update_rpm(self):
-        now = time.ticks_ms()
-        if time.ticks_diff(now, self._rpm_timer) >= 15000:  # 15 seconds
-            self.rpm = (self._rpm_counter * 4)  # extrapolate to 60 sec
-            self._rpm_counter = 0
-            self._rpm_timer = now
+    def _update_velocity(self, delta, t_us, first):
+        if first:
+            self._last_us = t_us
+            return
+        dt = time.ticks_diff(t_us, self._last_us)
+        if dt <= 0:
+            return
+        self._last_us = t_us
+        dt *= 1e-6
+
+        # Alpha-beta filter, kept relative to the measured position so the
+        # float state stays small no matter how many turns have been made.
+        residual = delta - self._pos_err - self.velocity * dt
+        self._pos_err = (self.vel_alpha - 1.0) * residual
+        self.velocity += self.vel_beta * residual / dt
+
+        self.velocity_dps = self.velocity * _DEG_PER_COUNT
+        self.rpm = self.velocity * (60.0 / COUNTS_PER_REV)
 
     # ------------------------------
     #  PUBLIC UPDATE FUNCTION
     # ------------------------------
     def update(self):
-        """Reads encoder and updates angle, turns & rpm."""
-        self._compute_angle()
-        self._compute_corrected()
-        self._update_turns()
-        self._update_total_angle()
-        self._update_rpm()
+        """Reads encoder and updates angle, turns & velocity."""
+        self.update_from_raw(self.read_raw())
+
+    def update_from_raw(self, raw, t_us=None):
+        """Processes a raw 14-bit reading taken at ticks_us() time t_us."""
+        if t_us is None:
+            t_us = time.ticks_us()
+        first = self._last_raw is None
+        if self.lut is not None:
+            raw = self._linearize(raw)
+        self.raw = raw
+        delta = self._unwrap(raw)
+        self._update_angles()
+        self._update_velocity(delta, t_us, first)
 
     # ------------------------------
     #  USER FUNCTIONS
     # ------------------------------
+    def _set_zero(self, zero_raw):
+        # Keep the current number of turns, only move the reference angle
+        offset = (self.raw - zero_raw) & _COUNT_MASK
+        self._zero = self._pos - offset - (self.turns << 14)
+        self._update_angles()
+
     def reset_zero(self):
         """Set the current angle as new zero reference."""
         self.start_angle = self.angle_deg
+        self._set_zero(self.raw)
 
     def set_start_angle(self, deg):
         """Manually set reference angle in degrees."""
         self.start_angle = deg
+        self._set_zero(int(deg / _DEG_PER_COUNT + 0.5) & _COUNT_MASK)
+
+    # ------------------------------
+    #  NONLINEARITY CORRECTION
+    # ------------------------------
+    def set_lut(self, lut):
+        """Installs a correction table (array('h') of LUT_SIZE counts) or None."""
+        if lut is not None and len(lut) != LUT_SIZE:
+            raise ValueError("correction table needs {} entries".format(LUT_SIZE))
+        self.lut = lut
+
+    def save_lut(self, path=LUT_FILE):
+        """Writes the correction table to flash."""
+        if self.lut is None:
+            raise ValueError("no LUT loaded")
+        with open(path, "wb") as f:
+            f.write(self.lut)
+
+    def load_lut(self, path=LUT_FILE):
+        """Reads a correction table from flash, returns False if there is none."""
+        lut = array('h', [0] * LUT_SIZE)
+        try:
+            with open(path, "rb") as f:
+                if f.readinto(lut) != 2 * LUT_SIZE:
+                    return False
+        except OSError:
+            return False
+        self.lut = lut
+        return True
+
+
+# ------------------------------
+#  CALIBRATION
+# ------------------------------
+def calibrate_lut(encoder, stepper, revolutions=2, sps=400):
+    """
+    Builds a correction table by sweeping the axis at a constant step rate.
+
+    The encoder must sit on the stepper output axis. The expected angle is
+    taken from the step count, a straight line fitted over the whole sweep
+    removes offset and gear ratio mismatch, and what remains is averaged per
+    table bin. Returns the table as array('h'); encoder.lut is left empty.
+    Raises RuntimeError when the encoder does not follow the motor (stall,
+    disabled driver, missing magnet).
+    """
+    encoder.lut = None
+    steps_per_rev = stepper.steps_per_rev * stepper.gear_ratio
+    counts_per_step = COUNTS_PER_REV / steps_per_rev
+    old_speed = stepper.speed_sps
+
+    sum_r = array('f', [0.0] * LUT_SIZE)   # residual per bin
+    sum_x = array('f', [0.0] * LUT_SIZE)   # sweep position (revolutions) per bin
+    n = array('H', [0] * LUT_SIZE)
+    acc_r = acc_x = acc_xx = acc_xr = 0.0
+    samples = 0
+
+    # Time for 1/8 revolution plus start-up; the encoder must have moved by then
+    detect_ms = int(1000 * steps_per_rev / 8 / sps) + 1000
+
+    stepper.free_run(1, sps=sps)
+    try:
+        # Find out which way the encoder counts while getting up to speed
+        start = stepper.get_pos()
+        deadline = time.ticks_add(time.ticks_ms(), detect_ms)
+        last = encoder.read_raw()
+        moved = 0
+        while abs(moved) < COUNTS_PER_REV // 64:
+            if time.ticks_diff(deadline, time.ticks_ms()) < 0:
+                raise RuntimeError("encoder does not follow the motor")
+            raw = encoder.read_raw()
+            delta = (raw - last) & _COUNT_MASK
+            if delta >= _HALF_REV:
+                delta -= COUNTS_PER_REV
+            moved += delta
+            last = raw
+        sign = 1 if (moved > 0) == (stepper.get_pos() > start) else -1
+
+        p0 = stepper.get_pos()
+        pos = 0
+        total = revolutions * steps_per_rev
+        deadline = time.ticks_add(time.ticks_ms(), int(2000 * total / sps) + detect_ms)
+        while True:
+            raw = encoder.read_raw()
+            steps = stepper.get_pos() - p0
+            if steps >= total:
+                break
+            if time.ticks_diff(deadline, time.ticks_ms()) < 0:
+                raise RuntimeError("stepper did not finish the calibration sweep")
+            delta = (raw - last) & _COUNT_MASK
+            if delta >= _HALF_REV:
+                delta -= COUNTS_PER_REV
+            pos += delta
+            last = raw
+
+            x = steps / steps_per_rev
+            r = sign * steps * counts_per_step - pos
+            b = raw >> _LUT_SHIFT
+            sum_r[b] += r
+            sum_x[b] += x
+            if n[b] < 0xFFFF:
+                n[b] += 1
+            acc_r += r
+            acc_x += x
+            acc_xx += x * x
+            acc_xr += x * r
+            samples += 1
+    finally:
+        stepper.stop()
+        stepper.target(stepper.get_pos())
+        stepper.speed(old_speed)
+
+    if samples < 2:
+        raise RuntimeError("encoder calibration collected no samples")
+
+    # Linear trend (offset + ratio mismatch) of the residual
+    mean_x = acc_x / samples
+    slope = (acc_xr - acc_x * acc_r / samples) / (acc_xx - acc_x * mean_x)
+
+    err = array('f', [0.0] * LUT_SIZE)
+    filled = 0
+    for b in range(LUT_SIZE):
+        if n[b]:
+            err[b] = (sum_r[b] - slope * sum_x[b]) / n[b]
+            filled += 1
+    if filled == 0:
+        raise RuntimeError("encoder calibration collected no samples")
+
+    # Bins that got no samples are interpolated from their neighbours
+    for b in range(LUT_SIZE):
+        if n[b]:
+            continue
+        lo = b
+        while not n[lo]:
+            lo = (lo - 1) % LUT_SIZE
+        hi = b
+        while not n[hi]:
+            hi = (hi + 1) % LUT_SIZE
+        span = (hi - lo) % LUT_SIZE
+        err[b] = err[lo] + (err[hi] - err[lo]) * ((b - lo) % LUT_SIZE) / span
+
+    # Bin centres are half a bin off the table points, and only the shape of
+    # the error matters (the zero reference removes any constant offset)
+    mean = sum(err) / LUT_SIZE
+    lut = array('h', [0] * LUT_SIZE)
+    for b in range(LUT_SIZE):
+        v = (err[b - 1] + err[b]) * 0.5 - mean
+        lut[b] = max(-32768, min(32767, int(v + 0.5 if v >= 0 else v - 0.5)))
+    return lut
+
+
+class AS5048AChain:
+    """Reads a group of AS5048A encoders on one SPI bus in a single burst."""
+
+    def __init__(self, spi, encoders, cs_pin=None, pipelined=False):
+        self.spi = spi
+        self.encoders = encoders
+        self.pipelined = pipelined
+        n = len(encoders)
+
+        # --- Chip select: one shared pin in daisy-chain mode ---
+        self.cs = None
+        if cs_pin is not None:
+            self.cs = Pin(cs_pin, Pin.OUT)
+            self.cs.value(1)
+
+        # --- Preallocated buffers ---
+        self.raw = array('H', [0] * n)
+        self._tx = bytearray(b'\xff' * (2 * n))  # READ_CMD for every sensor
+        self._rx = bytearray(2 * n)
+        rx = memoryview(self._rx)
+        self._tx2 = memoryview(self._tx)[0:2]
+        self._rx2 = [rx[2 * i:2 * i + 2] for i in range(n)]
+
+    # ------------------------------
+    #  LOW-LEVEL SPI COMMUNICATION
+    # ------------------------------
+    def _burst(self):
+        if self.cs is not None:
+            # Daisy chain: every sensor shifts its frame on to the next one
+            self.cs.value(0)
+            self.spi.write_readinto(self._tx, self._rx)
+            self.cs.value(1)
+        else:
+            # Grouped chip selects: one frame per sensor, back to back
+            tx = self._tx2
+            rx = self._rx2
+            encoders = self.encoders
+            for i in range(len(encoders)):
+                cs = encoders[i].cs
+                cs.value(0)
+                self.spi.write_readinto(tx, rx[i])
+                cs.value(1)
+
+    def read_raw(self):
+        """Reads all sensors into self.raw and returns it."""
+        if not self.pipelined:
+            # The answer to a read command arrives in the next frame
+            self._burst()
+        self._burst()
+
+        rx = self._rx
+        raw = self.raw
+        for i in range(len(raw)):
+            raw[i] = ((rx[2 * i] << 8) | rx[2 * i + 1]) & _COUNT_MASK
+        return raw
+
+    # ------------------------------
+    #  PUBLIC UPDATE FUNCTION
+    # ------------------------------
+    def read(self):
+        """Reads all sensors and updates every encoder object."""
+        raw = self.read_raw()
+        t_us = time.ticks_us()
+        encoders = self.encoders
+        for i in range(len(raw)):
+            encoders[i].update_from_raw(raw[i], t_us)
+        return raw
+
+
+class AS5048ASampler:
+    """Timer-driven background sampling of an AS5048A into a ring buffer."""
+
+    def __init__(self, encoder, rate_hz=1000, size=256, oversample=1, decimate=1):
+        self.encoder = encoder
+        self.rate_hz = rate_hz
+        self.oversample = max(1, oversample)
+        self.decimate = max(1, decimate)
+
+        # --- Ring buffer (written by the timer, read by the main loop) ---
+        self.size = size
+        self.raw = array('H', [0] * size)
+        self.t_us = array('L', [0] * size)
+        self._head = 0  # next slot to write, only moved by the timer
+        self._tail = 0  # next slot to read, only moved by the consumer
+        self.overruns = 0
+
+        # --- Averaging state of the block being collected ---
+        self._n = 0
+        self._base = 0
+        self._acc = 0
+        self._t_first = 0
+
+        self._timer = Timer()
+        self._callback = self._on_timer  # bound once, no allocation per tick
+
+    # ------------------------------
+    #  TIMER
+    # ------------------------------
+    def start(self):
+        """Starts sampling at rate_hz."""
+        self._n = 0
+        self._timer.init(freq=self.rate_hz, mode=Timer.PERIODIC, callback=self._callback)
+
+    def stop(self):
+        """Stops sampling."""
+        self._timer.deinit()
+
+    def _on_timer(self, t):
+        read = self.encoder.read_raw
+        now = time.ticks_us()
+        total = self.oversample * self.decimate
+
+        for _ in range(self.oversample):
+            raw = read()
+            if self._n == 0:
+                self._base = raw
+                self._acc = 0
+                self._t_first = now
+            else:
+                # Average as signed steps from the first reading of the block
+                delta = (raw - self._base) & _COUNT_MASK
+                if delta >= _HALF_REV:
+                    delta -= COUNTS_PER_REV
+                self._acc += delta
+            self._n += 1
+
+        if self._n < total:
+            return
+        self._n = 0
+
+        head = self._head
+        nxt = head + 1
+        if nxt == self.size:
+            nxt = 0
+        if nxt == self._tail:
+            self.overruns += 1
+            return
+
+        self.raw[head] = (self._base + (self._acc + total // 2) // total) & _COUNT_MASK
+        self.t_us[head] = time.ticks_add(self._t_first, time.ticks_diff(now, self._t_first) // 2)
+        self._head = nxt
+
+    # ------------------------------
+    #  CONSUMER API
+    # ------------------------------
+    def available(self):
+        """Returns the number of samples waiting in the buffer."""
+        n = self._head - self._tail
+        if n < 0:
+            n += self.size
+        return n
+
+    def drain(self, raw_out, t_out=None):
+        """Moves up to len(raw_out) samples into the given arrays, returns count."""
+        tail = self._tail
+        head = self._head
+        n = 0
+        limit = len(raw_out)
+        while tail != head and n < limit:
+            raw_out[n] = self.raw[tail]
+            if t_out is not None:
+                t_out[n] = self.t_us[tail]
+            n += 1
+            tail += 1
+            if tail == self.size:
+                tail = 0
+        self._tail = tail
+        return n
+
+    def process(self):
+        """Feeds all waiting samples to the encoder, returns count."""
+        enc = self.encoder
+        tail = self._tail
+        head = self._head
+        n = 0
+        while tail != head:
+            enc.update_from_raw(self.raw[tail], self.t_us[tail])
+            n += 1
+            tail += 1
+            if tail == self.size:
+                tail = 0
+        self._tail = tail
+        return n
@@ -0,0 +1,257 @@
+"""
+Alt/Az <-> RA/Dec Coordinate Engine for MicroPython
+---------------------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython)
+
+Converts between equatorial (RA/Dec) and horizontal (Alt/Az) coordinates
+for one observing site. The sine and cosine of the site latitude are
+computed once. Local sidereal time is kept as an integer in micro-degrees
+and advanced incrementally from ticks_ms() with an integer rate plus a
+20-bit fraction accumulator, so it stays exact to well below an
+arc-second over days and never needs float arithmetic on large angles
+(MicroPython floats are single precision on the Pico). Hour angles are
+formed as integer differences before the conversion to radians.
+
+Azimuth is measured from north through east (0..360), altitude above the
+horizon (-90..90), RA and Dec in degrees. Refraction, precession and
+nutation are not applied: good for pointing, not for astrometry.
+
+Usage example
+-------------
+
+from coords import Site, SiderealClock, radec_to_altaz, Targets
+from array import array
+import time
+
+site = Site(lat_deg=52.0, lon_deg=5.1)
+clock = SiderealClock(site, unix_time=time.time())   # RTC set to UTC
+
+alt, az = radec_to_altaz(site, clock.lst_udeg(), 279.2347, 38.7837)  # Vega
+
+stars = Targets(16)
+stars.add(279.2347, 38.7837)
+stars.add(101.2872, -16.7161)
+alt_out = array('f', [0] * 16)
+az_out = array('f', [0] * 16)
+stars.to_altaz(site, clock.lst_udeg(), alt_out, az_out)
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class Site(lat_deg, lon_deg)
+----------------------------
+    lat_deg : Geographic latitude, north positive
+    lon_deg : Geographic longitude, east positive
+
+Class SiderealClock(site, unix_time=None)
+-----------------------------------------
+    unix_time : UTC seconds since 1970-01-01 (e.g. time.time() with the RTC on
+                UTC); sync() can be called later instead
+
+Methods:
+    sync(unix_time, ms=0) : Sets the clock from UTC seconds (+ ms) at this moment
+    lst_udeg(now=None)    : Local sidereal time in micro-degrees (int), now in
+                            ticks_ms (read when omitted)
+    lst_deg(now=None)     : Local sidereal time in degrees
+
+Functions:
+    radec_to_altaz(site, lst_udeg, ra_deg, dec_deg)  -> (alt_deg, az_deg)
+    altaz_to_radec(site, lst_udeg, alt_deg, az_deg)  -> (ra_deg, dec_deg)
+    hour_angle_udeg(lst_udeg, ra_udeg)               -> hour angle, -180..180 deg
+    hadec_to_altaz(site, ha_rad, sin_dec, cos_dec)   -> (alt_deg, az_deg), for
+                                                        callers that keep a target's
+                                                        sin/cos Dec
+    parallactic_angle(site, ha_rad, sin_dec, cos_dec) -> field rotation angle in
+                                                        degrees, -180..180
+
+Class Targets(capacity)
+-----------------------
+    Preallocated RA/Dec list for batched conversion:
+    add(ra_deg, dec_deg) -> index, clear(), len(targets)
+    to_altaz(site, lst_udeg, alt_out, az_out) : Fills two float arrays
+"""
+
+from math import sin, cos, asin, atan2, radians, degrees
+from array import array
+import time
+
+UDEG_PER_REV = 360000000
+_HALF_REV = UDEG_PER_REV // 2
+
+# Sidereal rate: 360.98564736629 deg per day = 4 + 186725 / 2^20 udeg per ms
+_RATE_INT = 4
+_RATE_FRAC = 186725
+_FRAC_BITS = 20
+_FRAC_MASK = (1 << _FRAC_BITS) - 1
+_MAX_STEP_MS = 4096  # keeps dt * _RATE_FRAC a small int
+
+# GMST at J2000.0 (2000-01-01 12:00 UT = unix 946728000) in udeg and the
+# sidereal rate per second as an exact fraction
+_J2000_UNIX = 946728000
+_GMST_J2000_UDEG = 280460618
+_RATE_NUM = 36098564736629
+_RATE_DEN = 8640000000
+
+_UDEG2RAD = radians(1.0) / 1000000
+
+# sidereal advance of the hour angle per ms, as a float for predictions
+SIDEREAL_UDEG_PER_MS = _RATE_NUM / (_RATE_DEN * 1000)
+
+
+class Site:
+    """Observing site with precomputed latitude terms."""
+
+    def __init__(self, lat_deg, lon_deg):
+        self.lat = lat_deg
+        self.lon = lon_deg
+        self.sin_lat = sin(radians(lat_deg))
+        self.cos_lat = cos(radians(lat_deg))
+        self.lon_udeg = int(round(lon_deg * 1000000)) % UDEG_PER_REV
+
+
+class SiderealClock:
+    """Local sidereal time as an incrementally advanced integer."""
+
+    def __init__(self, site, unix_time=None):
+        self.site = site
+        self._lst = 0
+        self._frac = 0
+        self._ref_ms = time.ticks_ms()
+        if unix_time is not None:
+            self.sync(unix_time)
+
+    def sync(self, unix_time, ms=0):
+        """Sets the clock from UTC seconds since 1970 (+ ms) at this moment."""
+        self._ref_ms = time.ticks_ms()
+        # exact integer GMST; the big numbers only occur here
+        t = (int(unix_time) - _J2000_UNIX) * 1000 + ms
+        num = t * _RATE_NUM
+        den = _RATE_DEN * 1000
+        self._lst = (_GMST_J2000_UDEG + num // den + self.site.lon_udeg) % UDEG_PER_REV
+        self._frac = (num % den) * (1 << _FRAC_BITS) // den
+
+    def _advance(self, now):
+        dt = time.ticks_diff(now, self._ref_ms)
+        if dt <= 0:
+            return
+        self._ref_ms = now
+        lst = self._lst
+        frac = self._frac
+        while dt > 0:
+            d = dt if dt < _MAX_STEP_MS else _MAX_STEP_MS
+            frac += d * _RATE_FRAC
+            lst += d * _RATE_INT + (frac >> _FRAC_BITS)
+            frac &= _FRAC_MASK
+            dt -= d
+        self._lst = lst % UDEG_PER_REV
+        self._frac = frac
+
+    def lst_udeg(self, now=None):
+        """Local sidereal time in micro-degrees."""
+        self._advance(time.ticks_ms() if now is None else now)
+        return self._lst
+
+    def lst_deg(self, now=None):
+        """Local sidereal time in degrees."""
+        return self.lst_udeg(now) / 1000000
+
+
+# ------------------------------
+#  CONVERSIONS
+# ------------------------------
+def hour_angle_udeg(lst_udeg, ra_udeg):
+    """Hour angle in micro-degrees, wrapped to -180..180 deg."""
+    h = (lst_udeg - ra_udeg) % UDEG_PER_REV
+    return h - UDEG_PER_REV if h >= _HALF_REV else h
+
+
+def hadec_to_altaz(site, h, sin_dec, cos_dec):
+    """Hour angle h (radians) and sin/cos of Dec to (alt_deg, az_deg)."""
+    cos_h = cos(h)
+    sin_alt = site.sin_lat * sin_dec + site.cos_lat * cos_dec * cos_h
+    if sin_alt > 1.0:
+        sin_alt = 1.0
+    elif sin_alt < -1.0:
+        sin_alt = -1.0
+    az = atan2(-cos_dec * sin(h), sin_dec * site.cos_lat - cos_dec * cos_h * site.sin_lat)
+    az = degrees(az)
+    if az < 0.0:
+        az += 360.0
+    return degrees(asin(sin_alt)), az
+
+
+def parallactic_angle(site, h, sin_dec, cos_dec):
+    """Parallactic angle in degrees (-180..180) at hour angle h (radians)."""
+    return degrees(atan2(sin(h) * site.cos_lat, site.sin_lat * cos_dec - site.cos_lat * sin_dec * cos(h)))
+
+
+def radec_to_altaz(site, lst_udeg, ra_deg, dec_deg):
+    """Equatorial to horizontal, returns (alt_deg, az_deg)."""
+    h = hour_angle_udeg(lst_udeg, int(round(ra_deg * 1000000))) * _UDEG2RAD
+    dec = radians(dec_deg)
+    return hadec_to_altaz(site, h, sin(dec), cos(dec))
+
+
+def altaz_to_radec(site, lst_udeg, alt_deg, az_deg):
+    """Horizontal to equatorial, returns (ra_deg, dec_deg)."""
+    alt = radians(alt_deg)
+    az = radians(az_deg)
+    sin_alt = sin(alt)
+    cos_alt = cos(alt)
+    cos_az = cos(az)
+    sin_dec = site.sin_lat * sin_alt + site.cos_lat * cos_alt * cos_az
+    if sin_dec > 1.0:
+        sin_dec = 1.0
+    elif sin_dec < -1.0:
+        sin_dec = -1.0
+    h = atan2(-sin(az) * cos_alt, sin_alt * site.cos_lat - cos_alt * cos_az * site.sin_lat)
+    ra_udeg = (lst_udeg - int(round(degrees(h) * 1000000))) % UDEG_PER_REV
+    return ra_udeg / 1000000, degrees(asin(sin_dec))
+
+
+class Targets:
+    """Preallocated RA/Dec list converted to Alt/Az in one call."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.ra_udeg = array('l', [0] * capacity)
+        self.sin_dec = array('f', [0.0] * capacity)
+        self.cos_dec = array('f', [0.0] * capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._count = 0
+
+    def add(self, ra_deg, dec_deg):
+        """Adds a target, returns its index."""
+        i = self._count
+        if i == self.capacity:
+            raise IndexError("Targets full")
+        dec = radians(dec_deg)
+        self.ra_udeg[i] = int(round(ra_deg * 1000000)) % UDEG_PER_REV
+        self.sin_dec[i] = sin(dec)
+        self.cos_dec[i] = cos(dec)
+        self._count = i + 1
+        return i
+
+    def to_altaz(self, site, lst_udeg, alt_out, az_out):
+        """Fills alt_out[i], az_out[i] (degrees) for every target."""
+        ra = self.ra_udeg
+        sin_lat = site.sin_lat
+        cos_lat = site.cos_lat
+        for i in range(self._count):
+            # same as hadec_to_altaz(), inlined so the loop creates no tuples
+            h = hour_angle_udeg(lst_udeg, ra[i]) * _UDEG2RAD
+            sin_dec = self.sin_dec[i]
+            cos_dec = self.cos_dec[i]
+            cos_h = cos(h)
+            sin_alt = sin_lat * sin_dec + cos_lat * cos_dec * cos_h
+            alt_out[i] = degrees(asin(max(-1.0, min(1.0, sin_alt))))
+            az = degrees(atan2(-cos_dec * sin(h), sin_dec * cos_lat - cos_dec * cos_h * sin_lat))
+            az_out[i] = az + 360.0 if az < 0.0 else az
@@ -0,0 +1,192 @@
+"""
+Vertical Counter Debouncer for MicroPython
+------------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython)
+
+Debounces up to 16 inputs at once, e.g. a complete MCP23017 port snapshot.
+Every input has a 2-bit counter, stored "vertically": bit 0 of all counters
+lives in one integer, bit 1 in another. A tick costs a handful of integer
+operations no matter how many buttons there are. An input must read the
+same new level on 4 consecutive ticks before its debounced state flips, so
+with a 5 ms tick contacts are debounced over 20 ms.
+
+Per tick the debouncer reports which inputs were pressed, released or held
+long enough to count as a long press. Hold times use ticks_ms().
+
+Usage example
+-------------
+
+from mcp23017 import MCP23017
+from debounce import Debouncer
+import time
+
+mcp = MCP23017(i2c, 0x20)
+keys = Debouncer(mask=0x3ff8, active_low=True, long_press_ms=1000)
+
+while True:
+    keys.update(mcp.snapshot())
+    if keys.pressed & (1 << 5):
+        print("SET pressed")
+    if keys.long_pressed & (1 << 5):
+        print("SET held for a second")
+    time.sleep_ms(5)
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class Debouncer(mask=0xffff, active_low=True, long_press_ms=1000)
+-----------------------------------------------------------------
+    mask          : Bit mask of the inputs to debounce, other bits stay 0
+    active_low    : True when a pressed button reads 0 (pull-up wiring)
+    long_press_ms : Default hold time for a long press
+
+Attributes (bit masks, bit n = pin n, 1 = pressed / event happened):
+    state         : Debounced state of all inputs
+    pressed       : Inputs that became pressed on the last tick
+    released      : Inputs that were released on the last tick
+    released_short: Released without having reached a long press
+    long_pressed  : Inputs that reached their long press time on the last tick
+
+Methods:
+    update(snapshot, now=None) : One debounce tick with a raw 16-bit snapshot,
+                                 now in ticks_ms (read when omitted). Returns
+                                 pressed | released.
+    stable(snapshot)           : True when the snapshot equals the debounced
+                                 state, so ticks can be paused until it changes
+    is_pressed(pin)            : Debounced state of one pin
+    held_ms(pin, now=None)     : Time the pin is held, or was held when released
+    set_long_press(pin, ms)    : Per-pin long press time
+    reset(snapshot=None)       : Forget all counters, optionally starting from
+                                 a known snapshot without generating events
+"""
+
+from array import array
+import time
+
+
+class Debouncer:
+    """Bit-parallel debouncer for 16 inputs with press, release and long press."""
+
+    def __init__(self, mask=0xffff, active_low=True, long_press_ms=1000):
+        self.mask = mask & 0xffff
+        self.active_low = active_low
+
+        # --- Per-pin long press times and press timestamps ---
+        self._long_ms = array('l', [long_press_ms] * 16)
+        self._press_ms = array('l', [0] * 16)
+        self._held_ms = array('l', [0] * 16)
+
+        self.reset()
+
+    # ------------------------------
+    #  CONFIGURATION
+    # ------------------------------
+    def set_long_press(self, pin, ms):
+        """Sets the long press time of one pin in milliseconds."""
+        self._long_ms[pin] = ms
+
+    def reset(self, snapshot=None):
+        """Clears the counters, optionally taking snapshot as the debounced state."""
+        self._ct0 = 0xffff
+        self._ct1 = 0xffff
+        self.state = 0 if snapshot is None else self._normalize(snapshot)
+        self.pressed = 0
+        self.released = 0
+        self.released_short = 0
+        self.long_pressed = 0
+        self._long_pending = 0  # held, long press not reported yet
+        self._long_done = 0     # held, long press already reported
+
+    def _normalize(self, snapshot):
+        if self.active_low:
+            snapshot = ~snapshot
+        return snapshot & self.mask
+
+    # ------------------------------
+    #  DEBOUNCING
+    # ------------------------------
+    def update(self, snapshot, now=None):
+        """One tick with a raw snapshot, returns the mask of changed inputs."""
+        sample = self._normalize(snapshot)
+
+        # 2-bit vertical counter per input: counts down while the sample differs
+        # from the debounced state, reloads when it equals it, flips on wrap
+        i = self.state ^ sample
+        self._ct0 = ~(self._ct0 & i) & 0xffff
+        self._ct1 = (self._ct0 ^ (self._ct1 & i)) & 0xffff
+        i &= self._ct0 & self._ct1
+        self.state ^= i
+
+        pressed = self.state & i
+        released = i & ~self.state
+        self.pressed = pressed
+        self.released = released
+        self.released_short = released & ~self._long_done
+        self.long_pressed = 0
+
+        if not (i or self._long_pending):
+            return 0
+
+        if now is None:
+            now = time.ticks_ms()
+
+        # Hold times of released pins
+        m = released
+        while m:
+            bit = m & -m
+            pin = self._bit_index(bit)
+            self._held_ms[pin] = time.ticks_diff(now, self._press_ms[pin])
+            m ^= bit
+        self._long_pending &= ~released
+        self._long_done &= ~released
+
+        # Timestamps of new presses
+        m = pressed
+        while m:
+            bit = m & -m
+            self._press_ms[self._bit_index(bit)] = now
+            m ^= bit
+        self._long_pending |= pressed
+
+        # Long presses of pins still held
+        m = self._long_pending
+        while m:
+            bit = m & -m
+            pin = self._bit_index(bit)
+            if time.ticks_diff(now, self._press_ms[pin]) >= self._long_ms[pin]:
+                self.long_pressed |= bit
+            m ^= bit
+        self._long_pending &= ~self.long_pressed
+        self._long_done |= self.long_pressed
+
+        return pressed | released
+
+    @staticmethod
+    def _bit_index(bit):
+        n = 0
+        while bit > 1:
+            bit >>= 1
+            n += 1
+        return n
+
+    # ------------------------------
+    #  PER-PIN QUERIES
+    # ------------------------------
+    def stable(self, snapshot):
+        """True when snapshot matches the debounced state (nothing to count)."""
+        return self._normalize(snapshot) == self.state and self._ct0 & self._ct1 == 0xffff
+
+    def is_pressed(self, pin):
+        """Debounced state of one pin, True when pressed."""
+        return bool(self.state >> pin & 1)
+
+    def held_ms(self, pin, now=None):
+        """How long the pin is held, or was held when it was last released."""
+        if self.state >> pin & 1:
+            if now is None:
+                now = time.ticks_ms()
+            return time.ticks_diff(now, self._press_ms[pin])
+        return self._held_ms[pin]
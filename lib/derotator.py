@@ -0,0 +1,227 @@
+"""
+Field Derotator on an ST3215 Servo for MicroPython
+--------------------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython, asyncio)
+
+An alt-az mount that tracks a star rotates the field of view around the
+optical axis by the change of the parallactic angle q. The derotator turns
+the camera with an ST3215 serial bus servo by -q relative to the angle at
+start().
+
+The angle itself is computed with atan2 (coords.parallactic_angle), which
+stays well-defined close to the zenith where the rate
+    dq/dt = -w cos(lat) cos(az) / cos(alt)
+grows without bound. The rate and the field angle ahead are therefore
+predicted with the same atan2 at a later sidereal time, not from this
+formula. The commanded angle follows q at no more than
+max_rate deg/s; when a zenith pass asks for more, the servo catches up
+afterwards instead of being driven into its limits.
+
+The servo bus is not flooded: a new target is only sent when it differs
+by at least the required accuracy from the last one sent, and the next
+check is scheduled from the current rate (accuracy / rate, between
+min_interval_ms and max_interval_ms). Each target leads by half the
+rotation until the next check, so together with half a servo step of
+rounding the field error stays within the accuracy. Above a rate of
+(2 * accuracy - step) / min_interval_ms the checks cannot come faster and
+min_interval_ms limits the accuracy to +-(rate * min_interval_ms + step) / 2
+(0.1 deg up to 1.1 deg/s with the defaults and a 0.088 deg servo step).
+The servo runs in multi-turn position mode, so the camera can turn past
++-180 deg.
+
+Usage example
+-------------
+
+from machine import UART, Pin
+from serialservo import ST3215
+from derotator import Derotator
+import asyncio
+
+servo = ST3215(UART(1, baudrate=1000000, tx=Pin(4), rx=Pin(5), timeout=50))
+derot = Derotator(servo, 1, tracker, accuracy_deg=0.1)
+derot.setup_multiturn()    # once, writes the servo EEPROM
+tracker.track(279.2347, 38.7837)
+derot.start()
+asyncio.create_task(derot.run())
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class Derotator(servo, servo_id, tracker, gear_ratio=1.0, accuracy_deg=0.1, max_rate=20.0,
+                min_interval_ms=100, max_interval_ms=10000, invert=False)
+-----------------------------------------------------------------------------------------
+    servo        : ST3215 instance (src/serialservo.py)
+    servo_id     : Bus id of the derotator servo
+    tracker      : tracker.Tracker following the target
+    gear_ratio   : Servo revolutions per camera revolution
+    accuracy_deg : Allowed field angle error, sets the update threshold
+    max_rate     : Highest camera rotation rate in deg/s
+    min_interval_ms, max_interval_ms : Bounds of the check interval; the
+                   shortest one limits the accuracy at high field rates
+    invert       : Reverses the rotation direction
+
+Attributes:
+    angle        : Parallactic angle change since start() or the last target
+                   change (deg, unwrapped)
+    command      : Rate-limited camera angle sent to the servo (deg)
+    rate         : Field rotation rate dq/dt over the coming interval (deg/s)
+    writes       : Number of target positions sent
+
+Methods:
+    setup_multiturn() : Puts the servo in multi-turn position mode (EEPROM)
+    start()           : Takes the current servo position as the current field
+    update(now=None)  : Sends a new target when needed, returns ms to next check
+    run()             : Coroutine calling update() at the scheduled times
+"""
+
+import asyncio
+import time
+from coords import SIDEREAL_UDEG_PER_MS
+
+STEPS_PER_REV = 4096      # ST3215 position resolution
+MAX_POSITION = 30719      # multi-turn target range +-(bit 15 is the sign)
+_SERVO_MODE_POSITION = 0
+
+
+class Derotator:
+    """Streams the parallactic angle to an ST3215 servo, rate-limited and thresholded."""
+
+    def __init__(self, servo, servo_id, tracker, gear_ratio=1.0, accuracy_deg=0.1, max_rate=20.0,
+                 min_interval_ms=100, max_interval_ms=10000, invert=False):
+        self.servo = servo
+        self.id = servo_id
+        self.tracker = tracker
+        self.accuracy = accuracy_deg
+        self.max_rate = max_rate
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self._steps_per_deg = STEPS_PER_REV * gear_ratio / 360.0 * (-1 if invert else 1)
+        # a servo step is the floor of what can be resolved
+        self._threshold = max(1, int(accuracy_deg * abs(self._steps_per_deg)))
+        # field rotation allowed between checks: +-swing / 2 plus half a step of rounding
+        step = 1.0 / abs(self._steps_per_deg)
+        self._swing = max(step, 2.0 * accuracy_deg - step)
+
+        self.angle = 0.0
+        self.command = 0.0
+        self.rate = 0.0
+        self.writes = 0
+        self._q_last = 0.0
+        self._target = None
+        self._zero_steps = 0
+        self._sent = None
+        self._speed = -1
+        self._last_ms = 0
+        self.active = False
+
+    # ------------------------------
+    #  SERVO SETUP
+    # ------------------------------
+    def setup_multiturn(self):
+        """Position mode without angle limits (multi-turn); stored in the servo EEPROM."""
+        s = self.servo
+        s.EepromUnlock(self.id)
+        s.WriteRegister(self.id, s.MIN_ANGLE, 0)
+        s.WriteRegister(self.id, s.MAX_ANGLE, 0)
+        s.WriteRegister(self.id, s.OPERATION_MODE, _SERVO_MODE_POSITION)
+        s.EepromLock(self.id)
+
+    def start(self):
+        """Takes the current servo position as reference for the current field angle."""
+        # sign-magnitude like TARGET_LOCATION: negative after turning below zero
+        self._sent = self.servo.ReadRegister(self.id, self.servo.CURRENT_LOCATION)
+        self._speed = -1
+        self._reference(time.ticks_ms())
+        self.active = True
+
+    def _reference(self, now):
+        # the camera angle last sent belongs to the field of the current target
+        self._zero_steps = self._sent
+        self._target = self.tracker.target
+        self._q_last = self.tracker.parallactic_angle(self.tracker.clock.lst_udeg(now))
+        self._last_ms = now
+        self._interval = self.min_interval_ms
+        self.angle = 0.0
+        self.command = 0.0
+
+    def stop(self):
+        self.active = False
+
+    # ------------------------------
+    #  STREAMING
+    # ------------------------------
+    def _turn_ahead(self, lst, q, ms):
+        # predicted field rotation over the next ms, exact through the zenith
+        ahead = self.tracker.parallactic_angle(lst + int(ms * SIDEREAL_UDEG_PER_MS))
+        return (ahead - q + 180.0) % 360.0 - 180.0
+
+    def update(self, now=None):
+        """Sends a new servo target when needed, returns the ms until the next check."""
+        if not self.active:
+            return self.max_interval_ms
+        if not self.tracker.tracking:
+            self._target = None  # take a new reference when tracking resumes
+            return self.max_interval_ms
+        if now is None:
+            now = time.ticks_ms()
+        if self.tracker.target is not self._target:
+            # new target or tracking resumed: its field starts where the camera is
+            self._reference(now)
+        dt = min(time.ticks_diff(now, self._last_ms), self.max_interval_ms) * 0.001
+        self._last_ms = now
+
+        # unwrapped parallactic angle change since the reference
+        lst = self.tracker.clock.lst_udeg(now)
+        q = self.tracker.parallactic_angle(lst)
+        self.angle += (q - self._q_last + 180.0) % 360.0 - 180.0
+        self._q_last = q
+        self.rate = self._turn_ahead(lst, q, self._interval) * 1000 / self._interval
+
+        # follow -angle at no more than max_rate
+        err = -self.angle - self.command
+        limit = self.max_rate * dt
+        if err > limit:
+            err = limit
+        elif err < -limit:
+            err = -limit
+        self.command += err
+        catching_up = abs(-self.angle - self.command) > self.accuracy
+
+        # next check when the field has turned by the allowed swing
+        rate = abs(self.rate)
+        if catching_up:
+            interval = self.min_interval_ms
+        elif rate * self.max_interval_ms < self._swing * 1000:
+            interval = self.max_interval_ms
+        else:
+            interval = max(self.min_interval_ms, int(self._swing * 1000 / rate))
+
+        # aim halfway to the next check: the error swings between -+rate * interval / 2
+        lead = 0.0 if catching_up else -self._turn_ahead(lst, q, interval // 2)
+        self._interval = interval
+        target = self._zero_steps + int(round((self.command + lead) * self._steps_per_deg))
+        if target > MAX_POSITION:
+            target = MAX_POSITION
+        elif target < -MAX_POSITION:
+            target = -MAX_POSITION
+        if abs(target - self._sent) >= self._threshold:
+            self._send(target, self.max_rate if catching_up else rate)
+        return interval
+
+    def _send(self, target, rate_dps):
+        # servo speed a bit above the required rate so it never lags a step
+        speed = max(1, int(rate_dps * abs(self._steps_per_deg) * 2))
+        if self._speed < 0 or abs(speed - self._speed) * 4 > self._speed:
+            self.servo.WriteRegister(self.id, self.servo.OPERATION_SPEED, speed)
+            self._speed = speed
+        self.servo.WriteRegister(self.id, self.servo.TARGET_LOCATION, target)
+        self._sent = target
+        self.writes += 1
+
+    async def run(self):
+        """Calls update() whenever the field has rotated by about the accuracy."""
+        while True:
+            await asyncio.sleep_ms(self.update())
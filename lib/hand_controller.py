@@ -0,0 +1,268 @@
+"""
+Event-Driven Hand Controller for MicroPython
+--------------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython, asyncio)
+
+Runtime of the ALT/AZ hand controller on an MCP23017: four direction
+buttons, a SET button, a rotary encoder with push button and three LEDs.
+Nothing is polled while the controller is untouched. The MCP23017 INT line
+wakes the input task through a ThreadSafeFlag; it debounces on a 1 ms tick
+only while contacts are moving and otherwise sleeps until the next input
+change or the next deadline (auto-repeat, long press). Timed actions use
+ticks_ms() deadlines, so the latency from a stable button to its action is
+the debounce time of a few milliseconds. The LEDs are driven by a
+LedPatterns scheduler (led_patterns.py) in a second task.
+
+Controls:
+    ALT/AZ buttons : Step ALT_value / AZ_value, auto-repeat while held
+    Encoder        : Selects the step size (red LED 0.1 deg, yellow LED 1 deg)
+    Encoder key    : Stores the values, the selection LED blinks
+    SET short      : Stores the values, the green LED blinks
+    SET long (1 s) : Resets ALT and AZ to 0, green LED reset pattern
+
+Usage example
+-------------
+
+from machine import Pin, I2C
+from mcp23017 import MCP23017
+from hand_controller import HandController
+import asyncio
+
+mcp = MCP23017(I2C(1, scl=Pin(15), sda=Pin(14)), 0x20)
+hc = HandController(mcp, irq_pin=18)
+hc.on_change = lambda alt, az: print("ALT:", alt, "AZ:", az)
+asyncio.run(hc.run())
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class HandController(mcp, irq_pin, alt_dec=3, alt_inc=7, az_dec=4, az_inc=6,
+                     set_button=5, enc_a=10, enc_b=11, enc_key=12,
+                     led_green=0, led_red=2, led_yellow=1)
+----------------------------------------------------------------------------
+    mcp     : MCP23017 instance
+    irq_pin : Pico GPIO wired to the MCP23017 INTA/INTB output
+    other   : MCP23017 pin numbers of the buttons, encoder and LEDs
+
+Attributes:
+    alt, az     : Current set-points in degrees (ALT -90..90, AZ 0..360)
+    step        : Step size of the direction buttons in degrees
+    on_change   : Called as on_change(alt, az) after every set-point change
+    on_set      : Called as on_set(alt, az) on SET and on the encoder key
+
+Methods:
+    run()        : Coroutine running the input and LED tasks forever
+    set_values(alt, az) : Sets the set-points (clamped / wrapped)
+"""
+
+import asyncio
+import time
+from debounce import Debouncer
+from mcp_rotary_encoder import MCPRotaryEncoder
+from led_patterns import LedPatterns, BLINK
+
+DEBOUNCE_TICK_MS = 1     # tick while contacts are moving (4 ticks to accept)
+LONG_PRESS_MS = 1000     # SET held this long resets ALT/AZ
+REPEAT_DELAY_MS = 400    # first auto-repeat of a held direction button
+REPEAT_INTERVAL_MS = 100 # following auto-repeats
+
+RESET_BLINK_MS = (200, 200, 1500, 200, 200, 200) # green on/off times after reset
+
+# LED pattern priorities
+_BLINK_PRIORITY = 1
+_RESET_PRIORITY = 2
+
+STEP_RED = 0.1
+STEP_YELLOW = 1.0
+
+MIN_ALT, MAX_ALT = -90, 90
+MAX_AZ = 360
+
+
+class HandController:
+    """ALT/AZ hand controller driven by MCP23017 pin-change interrupts."""
+
+    def __init__(self, mcp, irq_pin, alt_dec=3, alt_inc=7, az_dec=4, az_inc=6,
+                 set_button=5, enc_a=10, enc_b=11, enc_key=12,
+                 led_green=0, led_red=2, led_yellow=1):
+        self.mcp = mcp
+        self.alt_dec = alt_dec
+        self.alt_inc = alt_inc
+        self.az_dec = az_dec
+        self.az_inc = az_inc
+        self.set_button = set_button
+        self.enc_key = enc_key
+        self.led_green = led_green
+        self.select_leds = (led_red, led_yellow)
+
+        self.on_change = None
+        self.on_set = None
+
+        # --- Set-points ---
+        self.alt = 0.0
+        self.az = 0.0
+        self.selection = -1
+        self.step = STEP_YELLOW
+
+        # --- Inputs ---
+        self._dir_mask = (1 << alt_dec) | (1 << alt_inc) | (1 << az_dec) | (1 << az_inc)
+        key_mask = self._dir_mask | (1 << set_button) | (1 << enc_key)
+        for pin in (alt_dec, alt_inc, az_dec, az_inc, set_button, enc_a, enc_b, enc_key):
+            mcp[pin].input(pull=1)
+        self.keys = Debouncer(mask=key_mask, active_low=True, long_press_ms=LONG_PRESS_MS)
+        self.encoder = MCPRotaryEncoder(mcp, pin_a=enc_a, pin_b=enc_b, min_val=0, max_val=19,
+                                        interrupt=True)
+        self._repeat_at = 0
+        self._long_at = 0
+        self._long_armed = False
+
+        # --- LEDs ---
+        self.leds = LedPatterns(mcp)
+        for pin in (led_green, led_red, led_yellow):
+            self.leds.set(pin, 0)
+
+        # --- Wake-up from the MCP interrupt handler ---
+        self._flag = asyncio.ThreadSafeFlag()
+        mcp.add_listener(self._on_input)
+        mcp.enable_interrupts(key_mask | (1 << enc_a) | (1 << enc_b), irq_pin=irq_pin)
+
+        self._select(self._selection_of(self.encoder.value))
+
+    # ------------------------------
+    #  SET-POINTS
+    # ------------------------------
+    def set_values(self, alt, az):
+        """Sets ALT (clamped to -90..90) and AZ (wrapped to 0..360) in degrees."""
+        self.alt = max(MIN_ALT, min(MAX_ALT, alt))
+        self.az = az % MAX_AZ
+        if self.on_change is not None:
+            self.on_change(self.alt, self.az)
+
+    def _stop_green(self):
+        self.leds.stop(self.led_green)
+
+    def _selection_of(self, value):
+        return 0 if value < 10 else 1
+
+    def _select(self, selection):
+        if selection == self.selection:
+            return
+        self.selection = selection
+        self.step = STEP_RED if selection == 0 else STEP_YELLOW
+        with self.mcp.batch():
+            for i, pin in enumerate(self.select_leds):
+                self.leds.set(pin, i == selection)
+
+    # ------------------------------
+    #  INPUT TASK
+    # ------------------------------
+    def _on_input(self, snapshot):
+        # MCP interrupt listener: only wake the input task
+        self._flag.set()
+
+    def _apply_direction(self, held):
+        alt = self.alt
+        az = self.az
+        if held & (1 << self.alt_inc):
+            alt += self.step
+        if held & (1 << self.alt_dec):
+            alt -= self.step
+        if held & (1 << self.az_inc):
+            az += self.step
+        if held & (1 << self.az_dec):
+            az -= self.step
+        self._stop_green()
+        self.set_values(alt, az)
+
+    def _handle_inputs(self, now):
+        mcp = self.mcp
+        keys = self.keys
+        snap = mcp.last_snapshot
+
+        # Encoder: selection of the step size
+        value = self.encoder.value
+        if self.encoder.update() != value:
+            for pin in self.select_leds:
+                self.leds.stop(pin)
+            self._stop_green()
+            self._select(self._selection_of(self.encoder.value))
+
+        if not keys.update(snap, now) and not keys.long_pressed:
+            # auto-repeat of held direction buttons
+            held = keys.state & self._dir_mask
+            if held and time.ticks_diff(now, self._repeat_at) >= 0:
+                self._repeat_at = time.ticks_add(self._repeat_at, REPEAT_INTERVAL_MS)
+                self._apply_direction(held)
+            return
+
+        # Direction buttons: step on press, auto-repeat while held
+        if keys.pressed & self._dir_mask:
+            self._apply_direction(keys.pressed & self._dir_mask)
+            self._repeat_at = time.ticks_add(now, REPEAT_DELAY_MS)
+
+        # Encoder key: store, selection LED blinks
+        if keys.pressed & (1 << self.enc_key):
+            self.leds.play(self.select_leds[self.selection], BLINK, _BLINK_PRIORITY)
+            self._stop_green()
+            if self.on_set is not None:
+                self.on_set(self.alt, self.az)
+
+        # SET: long press resets, short press stores
+        set_bit = 1 << self.set_button
+        if keys.pressed & set_bit:
+            self._long_at = time.ticks_add(now, LONG_PRESS_MS)
+            self._long_armed = True
+        if keys.long_pressed & set_bit:
+            self._long_armed = False
+            self._stop_green()
+            self.set_values(0, 0)
+            self.leds.play(self.led_green, RESET_BLINK_MS, _RESET_PRIORITY, repeat=False)
+        elif keys.released_short & set_bit:
+            self._long_armed = False
+            self._stop_green()
+            self.leds.play(self.led_green, BLINK, _BLINK_PRIORITY)
+            if self.on_set is not None:
+                self.on_set(self.alt, self.az)
+
+    def _input_timeout(self, now):
+        # ms until the input task has to run again, None = wait for an input change
+        if not self.keys.stable(self.mcp.last_snapshot):
+            return DEBOUNCE_TICK_MS
+        timeout = None
+        if self.keys.state & self._dir_mask:
+            timeout = max(0, time.ticks_diff(self._repeat_at, now))
+        if self._long_armed and self.keys.is_pressed(self.set_button):
+            t = max(0, time.ticks_diff(self._long_at, now))
+            timeout = t if timeout is None else min(timeout, t)
+        return timeout
+
+    async def _inputs(self):
+        while True:
+            now = time.ticks_ms()
+            self.mcp.service()  # fallback for a missed INT edge
+            with self.mcp.batch():
+                self._handle_inputs(now)
+            timeout = self._input_timeout(time.ticks_ms())
+            if timeout is None:
+                await self._flag.wait()
+            elif timeout <= DEBOUNCE_TICK_MS:
+                await asyncio.sleep_ms(timeout)
+            else:
+                try:
+                    await asyncio.wait_for_ms(self._flag.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    # ------------------------------
+    #  RUNTIME
+    # ------------------------------
+    async def run(self):
+        """Runs the input and LED tasks forever."""
+        leds = asyncio.create_task(self.leds.run())
+        try:
+            await self._inputs()
+        finally:
+            leds.cancel()
@@ -0,0 +1,280 @@
+"""
+Shared I2C Bus Manager for MicroPython
+--------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython)
+
+Owns one machine.I2C instance that is shared by several drivers (MCP23017,
+MPU6050, QMC5883L, ...). I2CBus offers the same transaction methods as
+machine.I2C, so it is passed to the drivers in place of the I2C object.
+Every transaction is serialised with a lock and counted per device address:
+number of transactions, bytes and bus time. Periodic device polls can be
+registered with a rate; run() executes the ones that are due within a bus
+time budget, so a slow device can never starve the rest of the loop.
+
+Locking: with _thread available a lock serialises the two cores. A soft IRQ
+handler that interrupts a transaction of its own thread does not wait for
+the lock (it would never be released); a single machine.I2C call is never
+interrupted halfway by a soft IRQ, so the transactions still don't overlap.
+
+Usage example
+-------------
+
+from machine import I2C, Pin
+from array import array
+from i2c_bus import I2CBus
+from MPU6050 import MPU6050
+from mcp23017 import MCP23017
+
+bus = I2CBus(I2C(0, scl=Pin(17), sda=Pin(16), freq=400000), freq=400000)
+mpu = MPU6050(bus=bus)
+mcp = MCP23017(bus, 0x20)
+
+sample = array('f', [0] * 7)
+bus.add_poll(lambda: mpu.read_all_into(sample), rate_hz=200)
+bus.add_poll(mcp.snapshot, rate_hz=100)
+
+while True:
+    bus.run(budget_us=2000)
+    ...
+bus.report()
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class I2CBus(i2c, freq=None)
+----------------------------
+    i2c  : machine.I2C or SoftI2C instance
+    freq : Bus clock in Hz, only used by report() for the wire time estimate
+
+I2C methods (locked and counted, same arguments as machine.I2C):
+    scan(), readfrom(), readfrom_into(), writeto(), readfrom_mem(),
+    readfrom_mem_into(), writeto_mem()
+
+Polling:
+    add_poll(fn, rate_hz) : Calls fn() rate_hz times per second from run()
+    remove_poll(fn)
+    run(budget_us=None)   : Runs the due polls, most overdue first, skipping
+                            polls whose measured cost exceeds the remaining
+                            budget. Returns the number of polls run.
+
+Statistics:
+    stats()       : {addr: (transactions, bytes, bus_us, errors)}
+    utilisation() : Fraction of the time since reset_stats() the bus was busy
+    reset_stats()
+    report()      : Prints the stats per address
+"""
+
+from array import array
+import time
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+# Indices in the per-address stats array
+_COUNT = 0
+_BYTES = 1
+_US = 2
+_ERRORS = 3
+
+# Indices in the per-poll array
+_PERIOD = 0
+_NEXT = 1
+_COST = 2
+
+
+class I2CBus:
+    """Locked, instrumented wrapper around one I2C bus with a poll scheduler."""
+
+    def __init__(self, i2c, freq=None):
+        self.i2c = i2c
+        self.freq = freq
+        self._lock = _thread.allocate_lock() if _thread is not None else None
+        self._owner = None
+
+        # --- Statistics ---
+        self._stats = {}
+        self._start_us = time.ticks_us()
+
+        # --- Polls: parallel lists of callables and [period, next, cost] ---
+        self._poll_fns = []
+        self._poll_state = []
+
+    # ------------------------------
+    #  LOCKING AND ACCOUNTING
+    # ------------------------------
+    def _acquire(self):
+        if self._lock is None:
+            return False
+        ident = _thread.get_ident()
+        if self._owner == ident:
+            # soft IRQ on top of our own transaction
+            return False
+        self._lock.acquire()
+        self._owner = ident
+        return True
+
+    def _release(self, locked):
+        if locked:
+            self._owner = None
+            self._lock.release()
+
+    def _account(self, addr, nbytes, start, ok):
+        st = self._stats.get(addr)
+        if st is None:
+            st = array('L', [0, 0, 0, 0])
+            self._stats[addr] = st
+        st[_COUNT] += 1
+        st[_BYTES] += nbytes
+        st[_US] += time.ticks_diff(time.ticks_us(), start)
+        if not ok:
+            st[_ERRORS] += 1
+
+    # ------------------------------
+    #  I2C METHODS
+    # ------------------------------
+    def scan(self):
+        locked = self._acquire()
+        try:
+            return self.i2c.scan()
+        finally:
+            self._release(locked)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        buf = bytearray(nbytes)
+        self.readfrom_into(addr, buf, stop)
+        return bytes(buf)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        locked = self._acquire()
+        start = time.ticks_us()
+        ok = False
+        try:
+            self.i2c.readfrom_into(addr, buf, stop)
+            ok = True
+        finally:
+            self._account(addr, len(buf), start, ok)
+            self._release(locked)
+
+    def writeto(self, addr, buf, stop=True):
+        locked = self._acquire()
+        start = time.ticks_us()
+        ok = False
+        try:
+            n = self.i2c.writeto(addr, buf, stop)
+            ok = True
+            return n
+        finally:
+            self._account(addr, len(buf), start, ok)
+            self._release(locked)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf, addrsize)
+        return bytes(buf)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        locked = self._acquire()
+        start = time.ticks_us()
+        ok = False
+        try:
+            self.i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+            ok = True
+        finally:
+            self._account(addr, len(buf) + addrsize // 8, start, ok)
+            self._release(locked)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        locked = self._acquire()
+        start = time.ticks_us()
+        ok = False
+        try:
+            self.i2c.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+            ok = True
+        finally:
+            self._account(addr, len(buf) + addrsize // 8, start, ok)
+            self._release(locked)
+
+    # ------------------------------
+    #  POLLING
+    # ------------------------------
+    def add_poll(self, fn, rate_hz):
+        """Calls fn() rate_hz times per second from run()."""
+        self._poll_fns.append(fn)
+        self._poll_state.append(array('l', [1000000 // rate_hz, time.ticks_us(), 0]))
+
+    def remove_poll(self, fn):
+        i = self._poll_fns.index(fn)
+        del self._poll_fns[i]
+        del self._poll_state[i]
+
+    def run(self, budget_us=None):
+        """Runs the due polls within budget_us of bus time, most overdue first."""
+        start = time.ticks_us()
+        done = 0
+        while True:
+            now = time.ticks_us()
+            used = time.ticks_diff(now, start)
+
+            # most overdue poll that still fits in the budget
+            best = -1
+            best_late = -1
+            for i in range(len(self._poll_fns)):
+                st = self._poll_state[i]
+                late = time.ticks_diff(now, st[_NEXT])
+                if late < 0 or late <= best_late:
+                    continue
+                if budget_us is not None and done and used + st[_COST] > budget_us:
+                    continue
+                best = i
+                best_late = late
+            if best < 0:
+                return done
+
+            st = self._poll_state[best]
+            self._poll_fns[best]()
+            end = time.ticks_us()
+            cost = time.ticks_diff(end, now)
+            st[_COST] = cost if st[_COST] == 0 else (3 * st[_COST] + cost) >> 2
+            # next deadline on the fixed grid, unless we fell a full period behind
+            st[_NEXT] = time.ticks_add(st[_NEXT], st[_PERIOD])
+            if time.ticks_diff(end, st[_NEXT]) > st[_PERIOD]:
+                st[_NEXT] = time.ticks_add(end, st[_PERIOD])
+            done += 1
+
+    # ------------------------------
+    #  STATISTICS
+    # ------------------------------
+    def stats(self):
+        """Returns {addr: (transactions, bytes, bus_us, errors)}."""
+        return {addr: tuple(st) for addr, st in self._stats.items()}
+
+    def utilisation(self):
+        """Fraction of the time since reset_stats() the bus was busy."""
+        busy = 0
+        for st in self._stats.values():
+            busy += st[_US]
+        elapsed = time.ticks_diff(time.ticks_us(), self._start_us)
+        return busy / elapsed if elapsed > 0 else 0.0
+
+    def reset_stats(self):
+        self._stats = {}
+        self._start_us = time.ticks_us()
+
+    def report(self):
+        """Prints transactions, bytes and bus time per device address."""
+        elapsed = time.ticks_diff(time.ticks_us(), self._start_us) / 1e6
+        print("I2C bus: {:.1f}% busy over {:.1f} s".format(self.utilisation() * 100, elapsed))
+        for addr in sorted(self._stats):
+            st = self._stats[addr]
+            line = "  {:#04x}: {} transactions, {} bytes, {} us, {} errors".format(
+                addr, st[_COUNT], st[_BYTES], st[_US], st[_ERRORS])
+            if self.freq:
+                # start, address byte, data bytes with ACK (9 bits each), stop
+                wire_us = (st[_BYTES] + 2 * st[_COUNT]) * 9 * 1000000 // self.freq
+                line += ", ~{} us on the wire at {} kHz".format(wire_us, self.freq // 1000)
+            print(line)
@@ -0,0 +1,161 @@
+"""
+Tilt / Level Sensor Fusion for MicroPython
+------------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython)
+
+Combines the MPU6050 gyroscope and accelerometer into a stable mount pitch
+and roll for polar and level alignment. The gyroscope gives smooth, fast
+angles that drift, the accelerometer gives drift-free angles that are
+disturbed by motor vibration. A complementary filter with a Mahony-style
+PI correction keeps the gyro angles locked to the accelerometer and
+estimates the gyro bias at the same time.
+
+Usage example
+-------------
+
+from MPU6050 import MPU6050
+from imu_fusion import TiltFilter
+import time
+
+mpu = MPU6050(bus=i2c)
+tilt = TiltFilter()
+
+while True:
+    tilt.update_from(mpu)
+    print("Pitch:", tilt.pitch, "Roll:", tilt.roll)
+    time.sleep_ms(5)
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class TiltFilter(kp=1.0, ki=0.05, accel_tolerance=0.15)
+-------------------------------------------------------
+    kp              : Pull of the accelerometer angle on the gyro angle (1/s)
+    ki              : Gyro bias learning rate (1/s^2)
+    accel_tolerance : Accelerometer samples whose magnitude deviates more
+                      than this fraction from 1 g are not used for correction
+
+Properties (read-only):
+    pitch, roll     : Mount tilt in degrees (same axes as MPU6050.read_angle)
+    bias_x, bias_y  : Estimated gyro bias in deg/s
+
+Methods:
+    update(sample, dt=None) : One filter step. sample holds (ax, ay, az, temp,
+                              gx, gy, gz) in g and deg/s, as filled by
+                              MPU6050.read_all_into(buf, g=True). dt in seconds,
+                              measured with ticks_us() when omitted.
+    update_from(mpu) : Reads the MPU6050 into a preallocated buffer and updates
+    reset()          : Restarts from the next accelerometer reading
+
+All state lives in preallocated arrays, a filter step creates no lists,
+tuples or dictionaries.
+"""
+
+from math import atan2, sqrt, pi
+from array import array
+import time
+
+_RAD2DEG = 180.0 / pi
+
+# Indices in the state array
+_PITCH = 0
+_ROLL = 1
+_BIAS_X = 2
+_BIAS_Y = 3
+
+
+class TiltFilter:
+    """Complementary pitch/roll filter with gyro bias estimation."""
+
+    def __init__(self, kp=1.0, ki=0.05, accel_tolerance=0.15):
+        self.kp = kp
+        self.ki = ki
+        self._acc_min = (1.0 - accel_tolerance) ** 2
+        self._acc_max = (1.0 + accel_tolerance) ** 2
+
+        # --- Preallocated state ---
+        self.state = array('f', [0.0] * 4)
+        self._sample = array('f', [0.0] * 7)
+        self._last_us = 0
+        self._started = False
+
+    # ------------------------------
+    #  PROPERTIES
+    # ------------------------------
+    @property
+    def pitch(self):
+        return self.state[_PITCH]
+
+    @property
+    def roll(self):
+        return self.state[_ROLL]
+
+    @property
+    def bias_x(self):
+        return self.state[_BIAS_X]
+
+    @property
+    def bias_y(self):
+        return self.state[_BIAS_Y]
+
+    # ------------------------------
+    #  FILTER
+    # ------------------------------
+    def reset(self):
+        """Restart from the next accelerometer reading, keeping the gyro bias."""
+        self._started = False
+
+    def update(self, sample, dt=None):
+        """One filter step with (ax, ay, az, temp, gx, gy, gz) in g and deg/s."""
+        now = time.ticks_us()
+        if dt is None:
+            dt = time.ticks_diff(now, self._last_us) * 1e-6
+        self._last_us = now
+
+        ax = sample[0]
+        ay = sample[1]
+        az = sample[2]
+        st = self.state
+
+        # Accelerometer tilt, same axes as MPU6050.read_angle()
+        acc_roll = atan2(ay, az) * _RAD2DEG
+        acc_pitch = atan2(-ax, sqrt(ay * ay + az * az)) * _RAD2DEG
+
+        if not self._started:
+            st[_ROLL] = acc_roll
+            st[_PITCH] = acc_pitch
+            self._started = True
+            return
+
+        # Only trust the accelerometer when it measures (close to) gravity
+        mag2 = ax * ax + ay * ay + az * az
+        if self._acc_min <= mag2 <= self._acc_max:
+            err_roll = acc_roll - st[_ROLL]
+            err_pitch = acc_pitch - st[_PITCH]
+            # Keep the error in -180..180 so the filter never spins the long way
+            if err_roll > 180.0:
+                err_roll -= 360.0
+            elif err_roll < -180.0:
+                err_roll += 360.0
+        else:
+            err_roll = 0.0
+            err_pitch = 0.0
+
+        # Mahony-style PI correction: P pulls the angle, I learns the bias
+        st[_BIAS_X] -= self.ki * err_roll * dt
+        st[_BIAS_Y] -= self.ki * err_pitch * dt
+        st[_ROLL] += (sample[4] - st[_BIAS_X] + self.kp * err_roll) * dt
+        st[_PITCH] += (sample[5] - st[_BIAS_Y] + self.kp * err_pitch) * dt
+
+        if st[_ROLL] > 180.0:
+            st[_ROLL] -= 360.0
+        elif st[_ROLL] < -180.0:
+            st[_ROLL] += 360.0
+
+    def update_from(self, mpu):
+        """Reads one burst sample from the MPU6050 and runs a filter step."""
+        if mpu.read_all_into(self._sample, True):
+            self.update(self._sample)
@@ -0,0 +1,169 @@
+"""
+LED Pattern Engine for MicroPython
+----------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython, asyncio)
+
+Plays blink patterns on MCP23017 (or compatible) output pins. A pattern is a
+sequence of durations in ms, alternating on and off and starting with on:
+(500, 500) is a 1 Hz blink, (200, 200, 1500) is flash - pause - long on.
+Every LED has a steady base level and any number of patterns with a
+priority; the highest priority pattern is shown, when it finishes the LED
+falls back to the next one or to its base level.
+
+A single scheduler knows the next transition deadline of all patterns. It
+sleeps until then, performs every transition that is due in one batched
+expander write and computes the next deadline. Between transitions it does
+nothing. Deadlines advance by the pattern durations, so patterns don't drift.
+
+Usage example
+-------------
+
+from led_patterns import LedPatterns, BLINK
+import asyncio
+
+leds = LedPatterns(mcp)
+leds.set(1, 1)                                    # yellow LED steady on
+leds.play(0, BLINK)                               # green LED blinks
+leds.play(0, (200, 200, 1500), priority=2, repeat=False)  # overrides once
+asyncio.run(leds.run())
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class LedPatterns(mcp)
+----------------------
+    mcp : MCP23017 (anything with mcp[pin].output(value) and mcp.batch())
+
+Methods:
+    set(pin, level)      : Steady base level of an LED (0/1)
+    play(pin, durations, priority=1, repeat=True) : Starts a pattern, replacing
+                           a pattern of the same priority on that LED
+    stop(pin, priority=None) : Stops one priority, or all patterns of the LED
+    playing(pin)         : True while the LED shows a pattern
+    update(now=None)     : Performs the due transitions, returns the ms until
+                           the next one or None when no pattern runs
+    run()                : Coroutine that calls update() at the deadlines
+"""
+
+import asyncio
+import time
+
+BLINK = (500, 500)
+
+# Indices in a pattern entry
+_PIN = 0
+_DURATIONS = 1
+_PRIORITY = 2
+_REPEAT = 3
+_INDEX = 4
+_DEADLINE = 5
+
+
+class LedPatterns:
+    """Priority based blink patterns with a single deadline scheduler."""
+
+    def __init__(self, mcp):
+        self.mcp = mcp
+        self._base = {}
+        self._patterns = []  # [pin, durations, priority, repeat, index, deadline]
+        self._wake = asyncio.Event()
+
+    # ------------------------------
+    #  PATTERNS
+    # ------------------------------
+    def set(self, pin, level):
+        """Sets the steady level the LED shows without a pattern."""
+        self._base[pin] = 1 if level else 0
+        self._show(pin)
+
+    def play(self, pin, durations, priority=1, repeat=True):
+        """Starts a pattern of on/off durations (ms) on the LED."""
+        self._remove(pin, priority)
+        now = time.ticks_ms()
+        self._patterns.append([pin, durations, priority, repeat, 0, time.ticks_add(now, durations[0])])
+        self._show(pin)
+        self._wake.set()
+
+    def stop(self, pin, priority=None):
+        """Stops the pattern of one priority, or all patterns of the LED."""
+        if self._remove(pin, priority):
+            self._show(pin)
+            self._wake.set()
+
+    def playing(self, pin):
+        for p in self._patterns:
+            if p[_PIN] == pin:
+                return True
+        return False
+
+    def _remove(self, pin, priority):
+        removed = False
+        i = 0
+        while i < len(self._patterns):
+            p = self._patterns[i]
+            if p[_PIN] == pin and (priority is None or p[_PRIORITY] == priority):
+                del self._patterns[i]
+                removed = True
+            else:
+                i += 1
+        return removed
+
+    def _show(self, pin):
+        # level of the highest priority pattern, else the base level
+        top = None
+        for p in self._patterns:
+            if p[_PIN] == pin and (top is None or p[_PRIORITY] > top[_PRIORITY]):
+                top = p
+        level = self._base.get(pin, 0) if top is None else (top[_INDEX] & 1) ^ 1
+        self.mcp[pin].output(level)
+
+    # ------------------------------
+    #  SCHEDULER
+    # ------------------------------
+    def update(self, now=None):
+        """Performs all due transitions in one batch, returns ms to the next one."""
+        if now is None:
+            now = time.ticks_ms()
+        wait = None
+        with self.mcp.batch():
+            i = 0
+            while i < len(self._patterns):
+                p = self._patterns[i]
+                left = time.ticks_diff(p[_DEADLINE], now)
+                if left <= 0:
+                    durations = p[_DURATIONS]
+                    while left <= 0:
+                        index = p[_INDEX] + 1
+                        if index == len(durations):
+                            if not p[_REPEAT]:
+                                break
+                            index = 0
+                        p[_INDEX] = index
+                        p[_DEADLINE] = time.ticks_add(p[_DEADLINE], durations[index])
+                        left = time.ticks_diff(p[_DEADLINE], now)
+                    if left <= 0:
+                        # finished, fall back to the next pattern or the base level
+                        del self._patterns[i]
+                        self._show(p[_PIN])
+                        continue
+                    self._show(p[_PIN])
+                if wait is None or left < wait:
+                    wait = left
+                i += 1
+        return wait
+
+    async def run(self):
+        """Sleeps until the next transition or until a pattern is started/stopped."""
+        while True:
+            wait = self.update()
+            self._wake.clear()
+            if wait is None:
+                await self._wake.wait()
+            else:
+                try:
+                    await asyncio.wait_for_ms(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
@@ -26,6 +26,10 @@ SOFTWARE.
 
 __version__ = '0.1.4'
 
+from machine import Pin, idle
+from array import array
+import time
+
 # register addresses in port=0, bank=1 mode (easier maths to convert)
 _MCP_IODIR        = const(0x00) # R/W I/O Direction Register
 _MCP_IPOL         = const(0x01) # R/W Input Polarity Port Register
@@ -48,12 +52,19 @@ _MCP_IOCON_SEQOP  = const(32)
 _MCP_IOCON_MIRROR = const(64)
 _MCP_IOCON_BANK   = const(128)
 
+# registers that only change when written, kept in a write-through shadow
+_MCP_SHADOWED = const(0x45f) # IODIR, IPOL, GPINTEN, DEFVAL, INTCON, GPPU, OLAT
+
 
 class Port():
     # represents one of the two 8-bit ports
     def __init__(self, port, mcp):
         self._port = port & 1  # 0=PortA, 1=PortB
         self._mcp = mcp
+        # shadow copy of the config and output latch registers, so reads cost
+        # no I2C traffic and writes of an unchanged value are skipped
+        self._shadow = bytearray(11)
+        self._shadow_valid = 0
 
     def _which_reg(self, reg):
         if self._mcp._config & 0x80 == 0x80:
@@ -70,16 +81,43 @@ class Port():
             setattr(self, reg, getattr(self, reg) & ~bit)
 
     def _read(self, reg):
-        return self._mcp._i2c.readfrom_mem(self._mcp._address, self._which_reg(reg), 1)[0]
+        bit = 1 << reg
+        if self._shadow_valid & bit:
+            return self._shadow[reg]
+        val = self._mcp._i2c.readfrom_mem(self._mcp._address, self._which_reg(reg), 1)[0]
+        if _MCP_SHADOWED & bit:
+            self._shadow[reg] = val
+            self._shadow_valid |= bit
+        return val
 
     def _write(self, reg, val):
         val &= 0xff
+        bit = 1 << reg
+        if self._shadow_valid & bit and self._shadow[reg] == val:
+            # register already holds this value
+            return
+        if reg == _MCP_OLAT and self._mcp._batch_depth:
+            # inside mcp.batch(): written on commit
+            self._shadow[reg] = val
+            self._shadow_valid |= bit
+            return
         self._mcp._i2c.writeto_mem(self._mcp._address, self._which_reg(reg), bytearray([val]))
+        if _MCP_SHADOWED & bit:
+            self._shadow[reg] = val
+            self._shadow_valid |= bit
+        elif reg == _MCP_GPIO:
+            # writing GPIO writes the output latch
+            self._shadow[_MCP_OLAT] = val
+            self._shadow_valid |= 1 << _MCP_OLAT
         # if writing to the config register, make a copy in mcp so that it knows
         # which bank you're using for subsequent writes
         if reg == _MCP_IOCON:
             self._mcp._config = val
 
+    def invalidate(self):
+        # forget the shadow registers, e.g. after the chip was reset
+        self._shadow_valid = 0
+
     @property
     def mode(self):
         return self._read(_MCP_IODIR)
@@ -162,6 +200,20 @@ class MCP23017():
         self._address = address
         self._config = 0x00
         self._virtual_pins = {}
+        self._gpio_buf = bytearray(2)
+        self.last_snapshot = 0
+        # interrupt mode
+        self._irq_pin = None
+        self._irq_buf = bytearray(6)
+        self._events = None
+        self._event_head = 0
+        self._event_tail = 0
+        self.events_dropped = 0
+        self._listeners = []
+        # batched output writes
+        self._batch_depth = 0
+        self._batch_olat = bytearray(2)
+        self._olat_buf = bytearray(2)
         self.init()
 
     def init(self):
@@ -238,7 +290,7 @@ class MCP23017():
         if value is not None:
             # 0: Pin is set to logic low
             # 1: Pin is set to logic high
-            port._flip_property_bit('gpio', value & 1, bit)
+            port._flip_property_bit('output_latch', value & 1, bit)
         if pullup is not None:
             # 0: Weak pull-up 100k ohm resistor disabled
             # 1: Weak pull-up 100k ohm resistor enabled
@@ -262,6 +314,193 @@ class MCP23017():
         if value is None:
             return port.gpio & bit == bit
 
+    def snapshot(self):
+        # read all 16 pins at once (bit 0-7 = GPA0-7, bit 8-15 = GPB0-7) and keep it
+        # in last_snapshot; pins and encoders can evaluate it without bus traffic
+        if self._config & (_MCP_IOCON_BANK | _MCP_IOCON_SEQOP) == 0:
+            # GPIOA and GPIOB are adjacent: one sequential 2-byte read
+            buf = self._gpio_buf
+            self._i2c.readfrom_mem_into(self._address, self.porta._which_reg(_MCP_GPIO), buf)
+            snap = buf[0] | (buf[1] << 8)
+        else:
+            snap = self.porta.gpio | (self.portb.gpio << 8)
+        self.last_snapshot = snap
+        return snap
+
+    # interrupt interface
+    # Changes on the enabled input pins pull the (mirrored, open drain) INT line
+    # low. The Pico pin IRQ then reads INTF, INTCAP and GPIO of both ports in one
+    # 6-byte burst, updates last_snapshot and queues one event per changed pin,
+    # so nothing touches the bus while the inputs are idle.
+    def enable_interrupts(self, pins, irq_pin, queue_size=32):
+        # pins: 16-bit mask of input pins that interrupt on change
+        # irq_pin: Pico GPIO number wired to INTA or INTB
+        # calling it again reconfigures, the previous pin IRQ is released
+        if self._irq_pin is not None:
+            self._irq_pin.irq(handler=None)
+        self._setup_interrupts(pins, queue_size)
+        self._irq_pin = Pin(irq_pin, Pin.IN, Pin.PULL_UP)
+        self._irq_pin.irq(trigger=Pin.IRQ_FALLING, handler=self._on_irq)
+        self.service()
+
+    def _setup_interrupts(self, pins, queue_size):
+        # chip side of enable_interrupts, also used by MCP23017Group
+        self.config(interrupt_mirror=1, interrupt_open_drain=1)
+        self.interrupt_compare_default = 0x0000  # compare against previous value
+        self.interrupt_enable = pins
+        self._events = array('B', [0] * queue_size)
+        self._event_head = 0
+        self._event_tail = 0
+        self.snapshot()
+
+    def disable_interrupts(self):
+        if self._irq_pin is not None:
+            self._irq_pin.irq(handler=None)
+            self._irq_pin = None
+        self.interrupt_enable = 0x0000
+
+    def add_listener(self, fn):
+        # fn(snapshot) is called for every new input state seen by the interrupt
+        # handler, also for short-lived states that the main loop would miss;
+        # a listener that is already registered is not added twice
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _on_irq(self, pin):
+        self.service()
+
+    def service(self):
+        # handle a pending interrupt (INT line low); safe to call from the main
+        # loop as a fallback for a missed edge. Returns the number of queued events
+        n = 0
+        while self._irq_pin is not None and self._irq_pin.value() == 0 and n < 4:
+            self._read_interrupt()
+            n += 1
+        return self.events_pending()
+
+    def _read_interrupt(self):
+        if self._config & (_MCP_IOCON_BANK | _MCP_IOCON_SEQOP) == 0:
+            # INTFA, INTFB, INTCAPA, INTCAPB, GPIOA, GPIOB are adjacent in bank 0
+            buf = self._irq_buf
+            self._i2c.readfrom_mem_into(self._address, self.porta._which_reg(_MCP_INTF), buf)
+            flags = buf[0] | (buf[1] << 8)
+            captured = buf[2] | (buf[3] << 8)
+            current = buf[4] | (buf[5] << 8)
+        else:
+            flags = self.interrupt_flag
+            captured = self.interrupt_captured
+            current = self.porta.gpio | (self.portb.gpio << 8)
+
+        # INTCAP holds the whole port at the moment of the interrupt
+        ports = (0x00ff if flags & 0x00ff else 0) | (0xff00 if flags & 0xff00 else 0)
+        captured = (self.last_snapshot & ~ports) | (captured & ports)
+        self._state_changed(captured, flags)
+        # GPIO catches anything that changed after the capture
+        self._state_changed(current, 0)
+
+    def _state_changed(self, snap, flags):
+        enabled = self.porta._read(_MCP_GPINTEN) | (self.portb._read(_MCP_GPINTEN) << 8)
+        changed = ((snap ^ self.last_snapshot) | flags) & enabled
+        self.last_snapshot = snap
+        if not changed:
+            return
+        for pin in range(16):
+            if changed & (1 << pin):
+                self._push_event((pin << 1) | ((snap >> pin) & 1))
+        for fn in self._listeners:
+            fn(snap)
+
+    def _push_event(self, event):
+        head = self._event_head
+        nxt = head + 1
+        if nxt == len(self._events):
+            nxt = 0
+        if nxt == self._event_tail:
+            self.events_dropped += 1
+            return
+        self._events[head] = event
+        self._event_head = nxt
+
+    def events_pending(self):
+        if self._events is None:
+            return 0
+        n = self._event_head - self._event_tail
+        return n + len(self._events) if n < 0 else n
+
+    def get_event(self):
+        # returns -1 when there is no event, otherwise (pin << 1) | value:
+        # pin = event >> 1, value = event & 1
+        tail = self._event_tail
+        if self._events is None or tail == self._event_head:
+            return -1
+        event = self._events[tail]
+        tail += 1
+        self._event_tail = 0 if tail == len(self._events) else tail
+        return event
+
+    def wait_event(self, timeout_ms=None):
+        # idle (no bus traffic) until an event is queued or the timeout expires
+        # returns True when there are events
+        start = time.ticks_ms()
+        while not self.events_pending():
+            if self.service():
+                break
+            if timeout_ms is not None and time.ticks_diff(time.ticks_ms(), start) >= timeout_ms:
+                return False
+            idle()
+        return True
+
+    # batched outputs
+    #   with mcp.batch():
+    #       mcp[0].output(1)
+    #       mcp[1].output(0)
+    # collects all output latch changes and writes them on leaving the block in a
+    # single OLATA+OLATB transaction, or not at all when nothing changed
+    def batch(self):
+        return self
+
+    def __enter__(self):
+        if self._batch_depth == 0:
+            # output latches as they are in the chip now
+            self._batch_olat[0] = self.porta._read(_MCP_OLAT)
+            self._batch_olat[1] = self.portb._read(_MCP_OLAT)
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.commit()
+        return False
+
+    def commit(self):
+        # write the output latches changed since the batch started
+        buf = self._olat_buf
+        buf[0] = self.porta._shadow[_MCP_OLAT]
+        buf[1] = self.portb._shadow[_MCP_OLAT]
+        changed_a = buf[0] != self._batch_olat[0]
+        changed_b = buf[1] != self._batch_olat[1]
+        if changed_a and changed_b and self._config & (_MCP_IOCON_BANK | _MCP_IOCON_SEQOP) == 0:
+            # OLATA and OLATB are adjacent: one sequential 2-byte write
+            self._i2c.writeto_mem(self._address, self.porta._which_reg(_MCP_OLAT), buf)
+        else:
+            mv = memoryview(buf)
+            if changed_a:
+                self._i2c.writeto_mem(self._address, self.porta._which_reg(_MCP_OLAT), mv[0:1])
+            if changed_b:
+                self._i2c.writeto_mem(self._address, self.portb._which_reg(_MCP_OLAT), mv[1:2])
+        self._batch_olat[0] = buf[0]
+        self._batch_olat[1] = buf[1]
+
+    def invalidate_cache(self):
+        # forget the shadow registers of both ports, the next reads go to the chip
+        self.porta.invalidate()
+        self.portb.invalidate()
+
     def interrupt_triggered_gpio(self, port):
         # which gpio triggered the interrupt
         # only 1 bit will be set
@@ -380,6 +619,7 @@ class VirtualPin():
         self._pin = pin % 8
         self._bit = 1 << self._pin
         self._port = port
+        self._snapshot_shift = pin
     def __call__(self):
         return self.value()
 
@@ -389,13 +629,20 @@ class VirtualPin():
     def _get_bit(self, value):
         return (value & self._bit) >> self._pin
 
-    def value(self, val=None):
+    def value(self, val=None, snapshot=None):
         # if val, write, else read
+        # snapshot: evaluate a value returned by MCP23017.snapshot() instead of reading
         if val is not None:
-            self._port.gpio = self._flip_bit(self._port.gpio, val & 1)
+            self._port.output_latch = self._flip_bit(self._port.output_latch, val & 1)
+        elif snapshot is not None:
+            return (snapshot >> self._snapshot_shift) & 1
         else:
             return self._get_bit(self._port.gpio)
 
+    def toggle(self):
+        # invert an output pin, using the output latch shadow (no read)
+        self._port.output_latch = self._port.output_latch ^ self._bit
+
     def input(self, pull=None):
         # if pull, enable pull up, else read
         self._port.mode = self._flip_bit(self._port.mode, 1) # mode = input
@@ -406,4 +653,145 @@ class VirtualPin():
         # if val, write, else read
         self._port.mode = self._flip_bit(self._port.mode, 0) # mode = output
         if val is not None:
-            self._port.gpio = self._flip_bit(self._port.gpio, val & 1)
+            self._port.output_latch = self._flip_bit(self._port.output_latch, val & 1)
+
+
+class MCP23017Group():
+    # up to eight chips (0x20-0x27) as one pin space: pin n is pin n % 16 of the
+    # n // 16-th chip, snapshots hold chip n in bits 16n..16n+15
+    def __init__(self, i2c, addresses=None):
+        if addresses is None:
+            addresses = [a for a in i2c.scan() if 0x20 <= a <= 0x27]
+        assert 1 <= len(addresses) <= 8
+        self._i2c = i2c
+        self.chips = [MCP23017(i2c, address) for address in addresses]
+        self._virtual_pins = {}
+        self.last_snapshot = 0
+        # interrupt mode
+        self._irq_pin = None
+        self._irq_chips = []
+        self._listeners = []
+        self._chip_listeners = [self._chip_listener(i) for i in range(len(self.chips))]
+
+    def __len__(self):
+        return 16 * len(self.chips)
+
+    def __getitem__(self, pin):
+        assert 0 <= pin < 16 * len(self.chips)
+        if not pin in self._virtual_pins:
+            chip = self.chips[pin >> 4]
+            # snapshot shift = pin, so value(snapshot=) takes group snapshots
+            self._virtual_pins[pin] = VirtualPin(pin, chip.portb if pin & 8 else chip.porta)
+        return self._virtual_pins[pin]
+
+    def snapshot(self, force=False):
+        # one 2-byte read per chip that has inputs; chips in interrupt mode keep
+        # their last_snapshot up to date themselves and are only read with force
+        snap = 0
+        for i, chip in enumerate(self.chips):
+            if chip.porta._read(_MCP_IODIR) | chip.portb._read(_MCP_IODIR):
+                if force or chip not in self._irq_chips:
+                    chip.snapshot()
+            snap |= chip.last_snapshot << (i << 4)
+        self.last_snapshot = snap
+        return snap
+
+    # interrupt interface
+    # All INT pins (mirrored, open drain) share one Pico input. On a falling edge
+    # only the chips with interrupt pins enabled are read, each with its own
+    # 6-byte burst; chips without a pending change report no flags.
+    def enable_interrupts(self, pins, irq_pin, queue_size=32):
+        # pins: group pin mask of input pins that interrupt on change
+        # calling it again reconfigures: chips leaving the mask are disabled
+        self.disable_interrupts()
+        for i, chip in enumerate(self.chips):
+            mask = (pins >> (i << 4)) & 0xffff
+            if mask:
+                chip._setup_interrupts(mask, queue_size)
+                chip.add_listener(self._chip_listeners[i])
+                self._irq_chips.append(chip)
+        self.snapshot(force=True)
+        self._irq_pin = Pin(irq_pin, Pin.IN, Pin.PULL_UP)
+        self._irq_pin.irq(trigger=Pin.IRQ_FALLING, handler=self._on_irq)
+        self.service()
+
+    def disable_interrupts(self):
+        if self._irq_pin is not None:
+            self._irq_pin.irq(handler=None)
+            self._irq_pin = None
+        for i, chip in enumerate(self.chips):
+            if chip in self._irq_chips:
+                chip.disable_interrupts()
+                chip.remove_listener(self._chip_listeners[i])
+        self._irq_chips = []
+
+    def add_listener(self, fn):
+        # fn(snapshot) with the group snapshot, see MCP23017.add_listener
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _chip_listener(self, i):
+        shift = i << 4
+        mask = ~(0xffff << shift)
+        def listener(snap):
+            self.last_snapshot = (self.last_snapshot & mask) | (snap << shift)
+            for fn in self._listeners:
+                fn(self.last_snapshot)
+        return listener
+
+    def _on_irq(self, pin):
+        self.service()
+
+    def service(self):
+        n = 0
+        while self._irq_pin is not None and self._irq_pin.value() == 0 and n < 4:
+            for chip in self._irq_chips:
+                chip._read_interrupt()
+            n += 1
+        return self.events_pending()
+
+    def events_pending(self):
+        n = 0
+        for chip in self._irq_chips:
+            n += chip.events_pending()
+        return n
+
+    def get_event(self):
+        # -1 or (pin << 1) | value with the group pin number
+        for i, chip in enumerate(self.chips):
+            event = chip.get_event()
+            if event >= 0:
+                return event + (i << 5)
+        return -1
+
+    def wait_event(self, timeout_ms=None):
+        start = time.ticks_ms()
+        while not self.events_pending():
+            if self.service():
+                break
+            if timeout_ms is not None and time.ticks_diff(time.ticks_ms(), start) >= timeout_ms:
+                return False
+            idle()
+        return True
+
+    # batched outputs on all chips, one OLAT write per chip that changed
+    def batch(self):
+        return self
+
+    def __enter__(self):
+        for chip in self.chips:
+            chip.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for chip in self.chips:
+            chip.__exit__(exc_type, exc, tb)
+        return False
+
+    def invalidate_cache(self):
+        for chip in self.chips:
+            chip.invalidate_cache()
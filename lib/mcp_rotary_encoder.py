@@ -1,49 +1,90 @@
+from array import array
+import time
+
+# Stap per overgang, index = (vorige toestand << 2) | nieuwe toestand,
+# toestand = (A << 1) | B. Ongeldige overgangen (twee bits tegelijk) tellen 0.
+_TRANSITIONS = array('b', [
+     0, +1, -1,  0,
+    -1,  0,  0, +1,
+    +1,  0,  0, -1,
+     0, -1, +1,  0,
+])
+
+
 class MCPRotaryEncoder:
-    def __init__(self, mcp, pin_a, pin_b, min_val=0, max_val=2):
+    # interrupt=True: decodeer elke toestand die de MCP interrupt ziet
+    #   (mcp.enable_interrupts), zodat snel draaien geen stappen verliest
+    # acceleration: 0 = uit, anders extra stappen per (stap/s) draaisnelheid,
+    #   begrensd op max_step per overgang
+    def __init__(self, mcp, pin_a, pin_b, min_val=0, max_val=2, interrupt=False,
+                 acceleration=0.0, max_step=10):
         self.mcp = mcp
         self.pin_a = pin_a
         self.pin_b = pin_b
         self.min_val = min_val
         self.max_val = max_val
+        self.acceleration = acceleration
+        self.max_step = max_step
 
         self.value = min_val
+        self.last_delta = 0  # laatste verandering van value (incl. versnelling)
+        self.speed = 0.0     # draaisnelheid in stappen per seconde
         self.last_state = self._read_state()
 
-        # Geldige transitions
-        self.transitions = {
-            (0b00, 0b01): +1,
-            (0b01, 0b11): +1,
-            (0b11, 0b10): +1,
-            (0b10, 0b00): +1,
-
-            (0b00, 0b10): -1,
-            (0b10, 0b11): -1,
-            (0b11, 0b01): -1,
-            (0b01, 0b00): -1,
-        }
-
-    def _read_state(self):
-        a = self.mcp[self.pin_a].value()
-        b = self.mcp[self.pin_b].value()
+        # stappen geteld door de interrupt listener, alleen daar geschreven
+        self.position = 0
+        self._applied = 0
+        self._last_move = time.ticks_ms()
+
+        self.interrupt = interrupt
+        if interrupt:
+            mcp.add_listener(self._on_snapshot)
+
+    def _read_state(self, snapshot=None):
+        if snapshot is None:
+            snapshot = self.mcp.snapshot()
+        a = (snapshot >> self.pin_a) & 1
+        b = (snapshot >> self.pin_b) & 1
         return (a << 1) | b
 
-    def update(self):
-        state = self._read_state()
+    def _decode(self, snapshot):
+        state = self._read_state(snapshot)
+        delta = _TRANSITIONS[(self.last_state << 2) | state]
+        self.last_state = state
+        return delta
 
-        if state != self.last_state:
-            delta = self.transitions.get((self.last_state, state), 0)
+    def _on_snapshot(self, snapshot):
+        # aangeroepen vanuit de MCP interrupt voor elke nieuwe ingangstoestand
+        self.position += self._decode(snapshot)
 
-            if delta != 0:
-                self.value += delta
+    # snapshot: waarde van mcp.snapshot(), anders wordt de poort zelf gelezen
+    # (niet gebruikt met interrupt=True, dan zijn de stappen al geteld)
+    def update(self, snapshot=None):
+        if self.interrupt:
+            position = self.position
+            delta = position - self._applied
+            self._applied = position
+        else:
+            delta = self._decode(snapshot)
 
-                # wrap-around
-                if self.value > self.max_val:
-                    self.value = self.min_val
-                elif self.value < self.min_val:
-                    self.value = self.max_val
+        if delta == 0:
+            self.last_delta = 0
+            return self.value
 
-            self.last_state = state
+        if self.acceleration:
+            now = time.ticks_ms()
+            dt = time.ticks_diff(now, self._last_move)
+            self._last_move = now
+            rate = abs(delta) * 1000 / dt if dt > 0 else self.speed
+            self.speed = 0.5 * self.speed + 0.5 * rate if dt < 500 else rate
+            step = 1 + int(self.acceleration * self.speed)
+            delta *= step if step < self.max_step else self.max_step
 
+        self.last_delta = delta
+        # wrap-around
+        span = self.max_val - self.min_val + 1
+        self.value = self.min_val + (self.value - self.min_val + delta) % span
         return self.value
+
     def get_value(self):
-        return self.value
\ No newline at end of file
+        return self.value
@@ -0,0 +1,299 @@
+"""
+Post-Slew Settle Detector for MicroPython
+-----------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython)
+
+After a goto the mount keeps ringing for a while. Instead of waiting a fixed
+time, this detector watches the MPU6050 accelerometer and gyroscope and
+reports the moment the motion has died out: the variances of the three
+accelerometer axes and of the three gyro axes over a sliding window, each
+summed per sensor, must both drop below a threshold. Per-axis variances also
+catch sideways ringing after an azimuth slew, which hardly changes the
+length of the gravity vector. Each sample costs O(1). The running sums hold
+offsets from a per-axis reference value, so the variance of a ~1 g axis is
+not lost in float rounding; they are refreshed from the window (with a new
+reference) once per window length to stop float drift.
+
+Optionally the dominant ringing frequency over the last window of one
+sample channel can be computed with a small in-place FFT (window must be a
+power of two).
+
+Usage example
+-------------
+
+from MPU6050 import MPU6050
+from settle_detector import SettleDetector
+from array import array
+
+mpu = MPU6050(bus=i2c)
+mpu.start_data_ready(int_pin=22, rate_hz=200)       # a new sample every 5 ms
+settle = SettleDetector(window=64, fft_channel=4)   # FFT on gyro X
+sample = array('f', [0] * 7)
+
+s1.target_deg(90)
+settle.reset()
+seen = mpu.samples_ready
+while not settle.settled:
+    if mpu.samples_ready != seen:                   # one update per data-ready
+        seen = mpu.samples_ready
+        mpu.read_all_into(sample, g=True)
+        settle.update(sample)
+print("Settled after", settle.settle_ms, "ms, ringing at",
+      settle.dominant_frequency(mpu.sample_rate), "Hz")
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class SettleDetector(window=64, accel_threshold=0.002, gyro_threshold=0.05, callback=None, fft_channel=None)
+------------------------------------------------------------------------------------------------------------
+    window          : Number of samples in the sliding window
+    accel_threshold : Standard deviation of the accel vector (g, all axes) considered still
+    gyro_threshold  : Standard deviation of the gyro vector (deg/s, all axes) considered still
+    callback        : Called as callback(detector) once when settled
+    fft_channel     : Sample index (0-6) kept for dominant_frequency()
+
+Properties (read-only):
+    settled         : True once motion fell below both thresholds
+    settle_ms       : Milliseconds from reset() until settled
+    accel_std       : Current standard deviation of the accel vector (g)
+    gyro_std        : Current standard deviation of the gyro vector (deg/s)
+
+Methods:
+    reset()         : Start watching (call right after commanding a slew)
+    update(sample)  : Adds (ax, ay, az, temp, gx, gy, gz) in g and deg/s, as
+                      filled by MPU6050.read_all_into(buf, g=True), evenly
+                      spaced at the sensor sample rate (one per data-ready
+                      or FIFO sample). Returns True on the sample where the
+                      mount became settled.
+    dominant_frequency(sample_rate) : Strongest ringing frequency of the
+                      fft_channel in the current window in Hz
+"""
+
+from math import sqrt, cos, sin, pi
+from array import array
+import time
+
+_ACCEL = 0
+_GYRO = 1
+
+# ax, ay, az, gx, gy, gz in a read_all_into() sample
+_CHANNELS = (0, 1, 2, 4, 5, 6)
+_NCH = 6
+
+
+class SettleDetector:
+    """Sliding-window variance settle detector for accel/gyro data."""
+
+    def __init__(self, window=64, accel_threshold=0.002, gyro_threshold=0.05, callback=None,
+                 fft_channel=None):
+        self.window = window
+        self.callback = callback
+        self._acc_var_max = accel_threshold * accel_threshold
+        self._gyr_var_max = gyro_threshold * gyro_threshold
+
+        # --- Preallocated window and running sums ---
+        self._win = array('f', [0.0] * (window * _NCH))  # samples, 6 channels each
+        self._ref = array('f', [0.0] * _NCH)             # per-axis offset reference
+        self._sums = array('f', [0.0] * (2 * _NCH))      # sum/sum of squares of the offsets
+        self._var = array('f', [0.0] * 2)
+        self._index = 0
+        self._count = 0
+
+        # --- Signed samples of one channel for the FFT ---
+        self.fft_channel = fft_channel
+        self._sig = None
+        if fft_channel is not None:
+            if window < 4 or window & (window - 1):
+                raise ValueError("FFT needs a power of two window")
+            self._sig = array('f', [0.0] * window)
+
+        # --- FFT work buffers, created on first use ---
+        self._re = None
+        self._im = None
+        self._cos = None
+        self._sin = None
+
+        self.settled = False
+        self.settle_ms = 0
+        self._start_ms = time.ticks_ms()
+
+    # ------------------------------
+    #  PROPERTIES
+    # ------------------------------
+    @property
+    def accel_std(self):
+        return sqrt(self._var[_ACCEL])
+
+    @property
+    def gyro_std(self):
+        return sqrt(self._var[_GYRO])
+
+    # ------------------------------
+    #  DETECTION
+    # ------------------------------
+    def reset(self):
+        """Start watching for a settled mount, e.g. right after a slew."""
+        self._index = 0
+        self._count = 0
+        for i in range(2 * _NCH):
+            self._sums[i] = 0.0
+        self.settled = False
+        self.settle_ms = 0
+        self._start_ms = time.ticks_ms()
+
+    def _resum(self):
+        # New reference (window mean) and running sums recomputed from the window
+        win = self._win
+        ref = self._ref
+        sums = self._sums
+        n = self._count
+        for c in range(_NCH):
+            m = 0.0
+            for k in range(c, n * _NCH, _NCH):
+                m += win[k]
+            m /= n
+            s = ss = 0.0
+            for k in range(c, n * _NCH, _NCH):
+                d = win[k] - m
+                s += d
+                ss += d * d
+            ref[c] = m
+            sums[2 * c] = s
+            sums[2 * c + 1] = ss
+
+    def _variance(self, first):
+        # Variances of three channels summed, from the offset sums
+        sums = self._sums
+        n = self._count
+        var = 0.0
+        for c in range(first, first + 3):
+            m = sums[2 * c] / n
+            var += sums[2 * c + 1] / n - m * m
+        return max(0.0, var)
+
+    def update(self, sample):
+        """
+        Adds one sample, returns True on the sample the mount became settled.
+
+        Samples must be evenly spaced at the sample rate, one per new sensor
+        sample: the window length in time and dominant_frequency() depend on it.
+        """
+        win = self._win
+        ref = self._ref
+        sums = self._sums
+        i = self._index
+        base = i * _NCH
+        full = self._count == self.window
+        if self._count == 0:
+            for c in range(_NCH):
+                ref[c] = sample[_CHANNELS[c]]
+        if not full:
+            self._count += 1
+        for c in range(_NCH):
+            if full:
+                d = win[base + c] - ref[c]
+                sums[2 * c] -= d
+                sums[2 * c + 1] -= d * d
+            x = sample[_CHANNELS[c]]
+            win[base + c] = x
+            d = x - ref[c]
+            sums[2 * c] += d
+            sums[2 * c + 1] += d * d
+        if self._sig is not None:
+            self._sig[i] = sample[self.fft_channel]
+
+        i += 1
+        if i == self.window:
+            i = 0
+            self._resum()
+        self._index = i
+
+        self._var[_ACCEL] = self._variance(0)
+        self._var[_GYRO] = self._variance(3)
+
+        if self.settled or self._count < self.window:
+            return False
+        if self._var[_ACCEL] <= self._acc_var_max and self._var[_GYRO] <= self._gyr_var_max:
+            self.settled = True
+            self.settle_ms = time.ticks_diff(time.ticks_ms(), self._start_ms)
+            if self.callback is not None:
+                self.callback(self)
+            return True
+        return False
+
+    # ------------------------------
+    #  RINGING FREQUENCY (FFT)
+    # ------------------------------
+    def _fft_setup(self):
+        n = self.window
+        self._re = array('f', [0.0] * n)
+        self._im = array('f', [0.0] * n)
+        self._cos = array('f', [cos(2 * pi * k / n) for k in range(n // 2)])
+        self._sin = array('f', [sin(2 * pi * k / n) for k in range(n // 2)])
+
+    def dominant_frequency(self, sample_rate):
+        """Returns the strongest frequency (Hz) of fft_channel in the current window."""
+        if self._sig is None:
+            raise ValueError("no fft_channel configured")
+        if self._re is None:
+            self._fft_setup()
+        n = self.window
+        re = self._re
+        im = self._im
+        src = self._sig
+        mean = 0.0
+        for k in range(n):
+            mean += src[k]
+        mean /= n
+
+        # Oldest sample first, mean removed, Hann window
+        first = self._index if self._count == n else 0
+        half = n // 2
+        for k in range(n):
+            c = self._cos[k] if k < half else -self._cos[k - half]
+            re[k] = (src[(first + k) % n] - mean) * (0.5 - 0.5 * c)
+            im[k] = 0.0
+
+        # Bit-reversal permutation
+        j = 0
+        for i in range(1, n):
+            bit = n >> 1
+            while j & bit:
+                j ^= bit
+                bit >>= 1
+            j |= bit
+            if i < j:
+                re[i], re[j] = re[j], re[i]
+
+        # Iterative radix-2 butterflies
+        size = 2
+        while size <= n:
+            half = size >> 1
+            step = n // size
+            for start in range(0, n, size):
+                t = 0
+                for k in range(start, start + half):
+                    wr = self._cos[t]
+                    wi = -self._sin[t]
+                    m = k + half
+                    xr = re[m] * wr - im[m] * wi
+                    xi = re[m] * wi + im[m] * wr
+                    re[m] = re[k] - xr
+                    im[m] = im[k] - xi
+                    re[k] += xr
+                    im[k] += xi
+                    t += step
+            size <<= 1
+
+        # Strongest bin, skipping DC
+        best = 1
+        best_p = 0.0
+        for k in range(1, n // 2):
+            p = re[k] * re[k] + im[k] * im[k]
+            if p > best_p:
+                best_p = p
+                best = k
+        return best * sample_rate / n
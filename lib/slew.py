@@ -0,0 +1,165 @@
+"""
+Rate-Limited Slewing for MicroPython
+------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython, asyncio)
+
+Turns ALT/AZ set-points (e.g. from the hand controller) into Stepper motion.
+Set-points are coalesced: only the latest one counts, no matter how many
+arrive between two updates. At a fixed interval every axis moves its
+commanded position toward the set-point with a trapezoidal profile
+(acceleration and maximum rate limited, braking in time to stop on the
+set-point). The Stepper runs in DDA rate mode (Stepper.rate_mode) at the
+profile rate plus a share of its lag behind the profile position: the step
+timer ticks at a fixed rate for the whole slew and only the accumulator
+increment changes, so a held button gives one smooth continuous slew
+instead of a burst of small moves that each restart the timer. On arrival
+the axis hands the set-point to Stepper.target_deg(), which leaves rate
+mode and restores the stepper's own speed for the last steps.
+
+Usage example
+-------------
+
+from stepper import Stepper
+from slew import Slewer
+import asyncio
+
+alt = Stepper(step_pin=9, dir_pin=10, en_pin=6, microstep=16, gear_ratio=2.0)
+az = Stepper(step_pin=12, dir_pin=13, en_pin=11, microstep=16, gear_ratio=2.0)
+slew = Slewer(alt, az, max_rate=5.0, accel=10.0)
+hc.on_change = slew.set_target         # HandController set-points
+asyncio.create_task(slew.run())
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class SlewAxis(stepper, max_rate=5.0, accel=10.0, wrap=False)
+-------------------------------------------------------------
+    stepper  : Stepper instance driving the axis
+    max_rate : Maximum slew rate in deg/s
+    accel    : Acceleration and deceleration in deg/s^2
+    wrap     : True for a 360 deg axis (AZ), set-points take the short way round
+
+Attributes:
+    position : Commanded position in degrees
+    rate     : Commanded rate in deg/s
+    target   : Set-point in degrees
+
+Methods:
+    set_target(deg) : New set-point
+    update(dt)      : Advances the profile by dt seconds, returns True while moving
+
+Class Slewer(alt_stepper, az_stepper, max_rate=5.0, accel=10.0, interval_ms=20)
+-------------------------------------------------------------------------------
+    interval_ms : Profile update interval while moving
+
+Attributes:
+    alt, az     : SlewAxis instances
+    moving      : True while any axis moves
+
+Methods:
+    set_target(alt, az) : Latest set-point of both axes in degrees
+    run()               : Coroutine updating the axes, sleeps while idle
+"""
+
+import asyncio
+from math import sqrt
+import time
+
+_MIN_TICK_HZ = 1000  # lowest rate mode tick
+_TICK_MARGIN = 2     # tick headroom over max_rate for the lag correction
+_CATCH_UP = 0.5      # fraction of the lag behind the profile corrected per update
+
+
+class SlewAxis:
+    """Trapezoidal, rate-limited follower of one axis set-point."""
+
+    def __init__(self, stepper, max_rate=5.0, accel=10.0, wrap=False):
+        self.stepper = stepper
+        self.max_rate = max_rate
+        self.accel = accel
+        self.wrap = wrap
+        steps_per_deg = stepper.steps_per_rev * stepper.gear_ratio / 360.0
+        self._steps_per_deg = steps_per_deg
+        self._tick_hz = max(_MIN_TICK_HZ, int(max_rate * steps_per_deg * _TICK_MARGIN))
+
+        self.position = stepper.get_pos_deg()
+        self.target = self.position
+        self.rate = 0.0
+
+    def set_target(self, deg):
+        """New set-point in degrees; a wrapping axis takes the short way round."""
+        if self.wrap:
+            deg = self.position + ((deg - self.position + 180.0) % 360.0 - 180.0)
+        self.target = deg
+
+    def update(self, dt):
+        """Advances the profile by dt seconds, returns True while moving."""
+        err = self.target - self.position
+        if err == 0.0 and self.rate == 0.0:
+            return False
+
+        # fastest rate that can still stop on the set-point
+        stop_rate = sqrt(2.0 * self.accel * abs(err))
+        want = min(self.max_rate, stop_rate)
+        if err < 0:
+            want = -want
+        dv = self.accel * dt
+        rate = self.rate
+        if want > rate + dv:
+            rate += dv
+        elif want < rate - dv:
+            rate -= dv
+        else:
+            rate = want
+
+        move = rate * dt
+        if (move * err > 0 and abs(move) >= abs(err)) or (abs(err) * self._steps_per_deg < 0.5 and abs(rate) <= dv):
+            # arrived: the stepper finishes at its own speed
+            self.position = self.target
+            self.rate = 0.0
+            self.stepper.target_deg(self.target)
+            return False
+
+        self.position += move
+        self.rate = rate
+        stepper = self.stepper
+        if not stepper.rate_active:
+            stepper.rate_mode(self._tick_hz)
+        lag = self.position - stepper.get_pos_deg()
+        stepper.rate_deg(rate + (_CATCH_UP * lag / dt if dt > 0 else 0.0))
+        return True
+
+
+class Slewer:
+    """Coalesces ALT/AZ set-points and slews both axes toward them."""
+
+    def __init__(self, alt_stepper, az_stepper, max_rate=5.0, accel=10.0, interval_ms=20):
+        self.alt = SlewAxis(alt_stepper, max_rate, accel)
+        self.az = SlewAxis(az_stepper, max_rate, accel, wrap=True)
+        self.interval_ms = interval_ms
+        self.moving = False
+        self._wake = asyncio.Event()
+
+    def set_target(self, alt, az):
+        """Latest set-point of both axes in degrees, earlier ones are dropped."""
+        self.alt.set_target(alt)
+        self.az.set_target(az)
+        self._wake.set()
+
+    async def run(self):
+        """Updates the axes every interval_ms while moving, sleeps while idle."""
+        last = time.ticks_ms()
+        while True:
+            if not self.moving:
+                await self._wake.wait()
+                last = time.ticks_ms()
+            self._wake.clear()
+            await asyncio.sleep_ms(self.interval_ms)
+            now = time.ticks_ms()
+            dt = time.ticks_diff(now, last) * 0.001
+            last = now
+            moving = self.alt.update(dt)
+            self.moving = self.az.update(dt) or moving
@@ -11,6 +11,9 @@ MICROSTEPPING_MODES = {
     16: (1, 1),  # TMC2209 ondersteunt 1/16 via MS1+MS2
 }
 
+# Rate mode (DDA): één stap per overloop van een 24-bit accumulator
+DDA_ONE = 1 << 24
+
 MICROSTEP_FACTORS = {
     1: 1,
     2: 2,
@@ -44,6 +47,14 @@ class Stepper:
         self.enabled = True
         self.free_direction = 0  # vrije richting, 0 = geen free run
 
+        # Rate mode (DDA)
+        self.rate_active = False
+        self.tick_hz = 0
+        self.rate_sps = 0.0
+        self._dda_acc = 0
+        self._dda_inc = 0
+        self._speed_before_rate = speed_sps
+
         # Stel microstepping pinnen in
         self.set_microstepping(self.microstep)
 
@@ -93,6 +104,18 @@ class Stepper:
         if not self.enabled:
             return
 
+        # Rate mode: accumulator bepaalt of deze tick een stap zet
+        if self.rate_active:
+            acc = self._dda_acc + self._dda_inc
+            if acc >= DDA_ONE:
+                acc -= DDA_ONE
+                self._step(1)
+            elif acc <= -DDA_ONE:
+                acc += DDA_ONE
+                self._step(-1)
+            self._dda_acc = acc
+            return
+
         # Free run prioriteit
         if self.free_direction != 0:
             self._step(self.free_direction)
@@ -123,6 +146,7 @@ class Stepper:
 
     # ---------------- TARGET ----------------
     def target(self, t):
+        self._leave_rate_mode()
         self.target_pos = int(t)
         self.free_direction = 0  # stop free run
 
@@ -140,14 +164,61 @@ class Stepper:
         direction = +1 (vooruit) of -1 (achteruit)
         sps = optioneel, snelheid in stappen/sec
         """
+        self._leave_rate_mode()
         self.free_direction = direction
         if sps is not None:
             self.speed_sps = abs(sps)
             self._restart_timer()
 
+    # ---------------- RATE MODE (DDA) ----------------
+    def rate_mode(self, tick_hz=1000):
+        """
+        Start rate mode: de timer tikt vast op tick_hz, rate() wijzigt alleen
+        de increment van de accumulator zodat de timer niet herstart wordt.
+        Maximale snelheid is tick_hz stappen/sec.
+        """
+        if not self.rate_active:
+            self._speed_before_rate = self.speed_sps
+        self.free_direction = 0
+        self.tick_hz = tick_hz
+        self._dda_acc = 0
+        self._dda_inc = 0
+        self.rate_sps = 0.0
+        self.rate_active = True
+        self.speed(tick_hz)
+
+    def rate(self, sps):
+        """
+        sps = snelheid in stappen/sec met teken (mag fractioneel zijn),
+        begrensd op tick_hz. Start rate mode met de standaard tick als die
+        nog niet actief is.
+        """
+        if not self.rate_active:
+            self.rate_mode()
+        inc = int(sps * DDA_ONE / self.tick_hz)
+        if inc > DDA_ONE:
+            inc = DDA_ONE
+        elif inc < -DDA_ONE:
+            inc = -DDA_ONE
+        self._dda_inc = inc
+        self.rate_sps = inc * self.tick_hz / DDA_ONE
+
+    def rate_deg(self, dps):
+        self.rate(dps * self.steps_per_rev * self.gear_ratio / 360.0)
+
+    def _leave_rate_mode(self, restart=True):
+        if self.rate_active:
+            self.target_pos = self.pos  # blijf staan tot er een nieuw doel is
+            self.rate_active = False
+            self.rate_sps = 0.0
+            self.speed_sps = self._speed_before_rate
+            if restart:
+                self._restart_timer()
+
     # ---------------- STOP ----------------
     def stop(self):
         self.free_direction = 0
+        self._leave_rate_mode(restart=False)
         self.timer.deinit()
 
     # ---------------- ENABLE ----------------
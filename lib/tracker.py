@@ -0,0 +1,185 @@
+"""
+Sidereal Alt/Az Tracker for MicroPython
+---------------------------------------
+
+Compatible with: Raspberry Pi Pico / Pico W (MicroPython, asyncio)
+
+Keeps an alt-az mount on an RA/Dec target. Both axis rates change all the
+time, so at a fixed update interval the tracker predicts the Alt/Az
+position one horizon ahead with the coordinate engine (coords.py) and
+gives every Stepper the rate that brings it there: the predicted motion
+over the horizon plus a share of the remaining position error. Between
+updates the steppers run these piecewise-linear rates in DDA rate mode
+(Stepper.rate_mode), so rate changes never restart the step timers and
+accumulated step errors are corrected on the next update.
+
+The achievable accuracy is set by the drive: one (micro)step of the axis
+is 360 / (steps_per_rev * microstep * gear_ratio) degrees.
+
+Usage example
+-------------
+
+from coords import Site, SiderealClock
+from tracker import Tracker
+import asyncio, time
+
+site = Site(lat_deg=52.0, lon_deg=5.1)
+clock = SiderealClock(site, unix_time=time.time())
+tracker = Tracker(clock, alt_stepper, az_stepper)
+tracker.track(279.2347, 38.7837)        # Vega, mount already pointed at it
+asyncio.run(tracker.run())
+
+-------------------------------------------------------------
+
+API Overview
+============
+
+Class Tracker(clock, alt_stepper, az_stepper, interval_ms=1000, horizon_ms=2000, gain=0.5, tick_hz=1000)
+-------------------------------------------------------------------------------------------------------
+    clock       : coords.SiderealClock of the site
+    interval_ms : Time between rate updates
+    horizon_ms  : How far ahead the position is predicted
+    gain        : Fraction of the position error corrected per horizon
+    tick_hz     : Stepper rate mode tick (maximum rate in steps/s)
+
+Attributes:
+    tracking      : True while a target is tracked
+    below_horizon : True when tracking stopped because the target set
+    target        : (ra_deg, dec_deg) of the last track() call, a new tuple per call
+    alt, az       : Target position at the last update (degrees)
+    alt_rate, az_rate : Axis rates at the last update (deg/s)
+
+Methods:
+    track(ra_deg, dec_deg) : Starts tracking (steppers enter rate mode)
+    stop()                 : Stops tracking, the steppers hold position
+    position(lst_udeg)     : (alt, az) of the target at a sidereal time
+    parallactic_angle(lst_udeg) : Field rotation angle of the target in degrees
+    update(now=None)       : One rate update, returns False when not tracking
+    run()                  : Coroutine calling update() every interval_ms
+"""
+
+import asyncio
+import time
+from coords import hour_angle_udeg, hadec_to_altaz, parallactic_angle, UDEG_PER_REV, SIDEREAL_UDEG_PER_MS
+from math import sin, cos, radians
+
+_UDEG2RAD = radians(1.0) / 1000000
+
+
+class _Axis:
+    # stepper plus unit conversion for one tracked axis
+
+    def __init__(self, stepper, wrap):
+        self.stepper = stepper
+        self.wrap = wrap
+
+    def error_deg(self, deg):
+        # target minus the actual stepper position, short way round for AZ
+        err = deg - self.stepper.get_pos_deg()
+        if self.wrap:
+            err = (err + 180.0) % 360.0 - 180.0
+        return err
+
+
+class Tracker:
+    """Predictive alt-az tracking through stepper rate mode."""
+
+    def __init__(self, clock, alt_stepper, az_stepper, interval_ms=1000, horizon_ms=2000,
+                 gain=0.5, tick_hz=1000):
+        self.clock = clock
+        self.site = clock.site
+        self.interval_ms = interval_ms
+        self.horizon_ms = horizon_ms
+        self.gain = gain
+        self.tick_hz = tick_hz
+        self._alt = _Axis(alt_stepper, False)
+        self._az = _Axis(az_stepper, True)
+
+        self.tracking = False
+        self.below_horizon = False
+        self.target = None
+        self.alt = 0.0
+        self.az = 0.0
+        self.alt_rate = 0.0
+        self.az_rate = 0.0
+
+        self._ra_udeg = 0
+        self._sin_dec = 0.0
+        self._cos_dec = 1.0
+        self._wake = asyncio.Event()
+
+    # ------------------------------
+    #  CONTROL
+    # ------------------------------
+    def track(self, ra_deg, dec_deg):
+        """Starts tracking RA/Dec; the mount should already point at the target."""
+        dec = radians(dec_deg)
+        self._ra_udeg = int(round(ra_deg * 1000000)) % UDEG_PER_REV
+        self._sin_dec = sin(dec)
+        self._cos_dec = cos(dec)
+        self.target = (ra_deg, dec_deg)
+        for axis in (self._alt, self._az):
+            axis.stepper.rate_mode(self.tick_hz)
+        self.tracking = True
+        self.below_horizon = False
+        self.update()
+        self._wake.set()
+
+    def stop(self):
+        """Stops tracking, the steppers hold their position."""
+        self.tracking = False
+        for axis in (self._alt, self._az):
+            if axis.stepper.rate_active:
+                axis.stepper.rate(0)
+        self.alt_rate = 0.0
+        self.az_rate = 0.0
+
+    def position(self, lst_udeg):
+        """Alt/Az of the target at a local sidereal time, in degrees."""
+        h = hour_angle_udeg(lst_udeg, self._ra_udeg) * _UDEG2RAD
+        return hadec_to_altaz(self.site, h, self._sin_dec, self._cos_dec)
+
+    def parallactic_angle(self, lst_udeg):
+        """Parallactic angle of the target at a local sidereal time, in degrees."""
+        h = hour_angle_udeg(lst_udeg, self._ra_udeg) * _UDEG2RAD
+        return parallactic_angle(self.site, h, self._sin_dec, self._cos_dec)
+
+    # ------------------------------
+    #  RATE UPDATE
+    # ------------------------------
+    def update(self, now=None):
+        """Predicts one horizon ahead and sets both axis rates."""
+        if not self.tracking:
+            return False
+        if now is None:
+            now = time.ticks_ms()
+        lst = self.clock.lst_udeg(now)
+        alt, az = self.position(lst)
+        if alt < 0.0:
+            self.stop()
+            self.below_horizon = True
+            return False
+        ahead_alt, ahead_az = self.position(lst + int(self.horizon_ms * SIDEREAL_UDEG_PER_MS))
+        self.alt = alt
+        self.az = az
+
+        # motion over the horizon plus a share of the current position error
+        h = self.horizon_ms * 0.001
+        d_az = (ahead_az - az + 180.0) % 360.0 - 180.0
+        self.alt_rate = (ahead_alt - alt + self.gain * self._alt.error_deg(alt)) / h
+        self.az_rate = (d_az + self.gain * self._az.error_deg(az)) / h
+        self._alt.stepper.rate_deg(self.alt_rate)
+        self._az.stepper.rate_deg(self.az_rate)
+        return True
+
+    async def run(self):
+        """Calls update() every interval_ms on a fixed grid while tracking."""
+        while True:
+            if not self.tracking:
+                self._wake.clear()
+                await self._wake.wait()
+            deadline = time.ticks_add(time.ticks_ms(), self.interval_ms)
+            while self.tracking:
+                await asyncio.sleep_ms(max(0, time.ticks_diff(deadline, time.ticks_ms())))
+                self.update(deadline)
+                deadline = time.ticks_add(deadline, self.interval_ms)
@@ -51,7 +51,7 @@ class ST3215:
     OPERATION_SPEED = (0x2E, 2, False)
     TORQUE_LIMIT = (0x30, 2, False)
     LOCK_FLAG = (0x37, 1, False)
-    CURRENT_LOCATION = (0x38, 2, False)
+    CURRENT_LOCATION = (0x38, 2, True)
     CURRENT_SPEED = (0x3A, 2, False)
     CURRENT_LOAD = (0x3C, 2, False)
     CURRENT_VOLTAGE = (0x3E, 1, False)
@@ -76,8 +76,9 @@ class ST3215:
     def WriteRegister(self, id, reg, value):
         adr = reg[0]
         l = reg[1]
+        signed = reg[2]
         if l == 2:
-            return self.servo.WriteWord(id, adr, value)
+            return self.servo.WriteWord(id, adr, value, signed)
         else:
             return self.servo.WriteChar(id, adr, value)
 
@@ -85,10 +86,10 @@ class ST3215:
         return self.servo.Ping(id)
     
     def EepromLock(self, id):
-        return self.servo.WriteChar(self.LOCK_FLAG[0], 1)
+        return self.servo.WriteChar(id, self.LOCK_FLAG[0], 1)
 
     def EepromUnlock(self, id):
-        return self.servo.WriteChar(self.LOCK_FLAG[0], 0)
+        return self.servo.WriteChar(id, self.LOCK_FLAG[0], 0)
     
 class SerialServo:
     PING = 0x01
@@ -126,23 +127,26 @@ class SerialServo:
             return False
 
 
-    def WriteWord(self, id, address, value):
-        return self.WriteData(id, address, value.to_bytes(2, "little"))
+    # signed words are sign-magnitude: bit 15 is the sign, bits 0-14 the value
+    def WriteWord(self, id, address, value, signed=False):
+        if signed and value < 0:
+            value = (-value & 0x7FFF) | 0x8000
+        return self.WriteData(id, address, (value & 0xFFFF).to_bytes(2, "little"))
 
     def ReadWord(self, id, address, signed=False):
         data = self.ReadData(id,address, 2)
         value = int(data[0]) + (int(data[1]) << 8)
-        if signed:
-            return -65536 + value
+        if signed and value & 0x8000:
+            return -(value & 0x7FFF)
         else:
             return value
 
     def WriteChar(self, id, address, value):
-        return self.WriteData(id, address, value.to_bytes(1))
+        return self.WriteData(id, address, (value & 0xFF).to_bytes(1, "little"))
     
     def ReadChar(self, id, address):
         data = self.ReadData(id,address, 1)
-        return int(data)
+        return int(data[0])
 
     def WriteData(self, id, address, data):
         params = bytearray((address & 0xFF,))
@@ -43,22 +43,26 @@ from machine import Pin, SPI
 spi = SPI(0, baudrate=1000000, polarity=0, phase=0, sck=Pin(2), mosi=Pin(3), miso=Pin(16))
 as5048 = AS5048A(spi=spi, cs_pin=Pin(1))
 
-#MPU6050
+#I2C bussen: één I2C object per bus, gedeeld door alle devices via I2CBus
 import machine
-from lib.mpu6050 import MPU6050
-i2c = machine.I2C(1, scl=machine.Pin(17), sda=machine.Pin(16), freq=100000)
-mpu = MPU6050(bus=i2c, addr=0x68)
+from machine import Pin, I2C
+from lib.i2c_bus import I2CBus
+imu_bus = I2CBus(I2C(0, scl=Pin(17), sda=Pin(16), freq=400000), freq=400000) # MPU6050 + QMC5883L
+ui_bus  = I2CBus(I2C(1, scl=Pin(15), sda=Pin(14), freq=400000), freq=400000) # MCP23017
+
+#MPU6050
+from lib.MPU6050 import MPU6050
+mpu = MPU6050(bus=imu_bus, addr=0x68)
 
 #QMC5883L
 from lib.qmc5883L import QMC5883
-i2c = machine.I2C(1, scl=machine.Pin(17), sda=machine.Pin(16), freq=100000)
-mag = QMC5883(i2c, irq=False, slvAddr=0x0D, autoScale=True)
+mag = QMC5883(imu_bus, irq=False, slvAddr=0x0D, autoScale=True)
 
 #mcp23017
-from machine import Pin, I2C
 import lib.mcp23017 as mcp23017
-i2c = I2C(scl=Pin(15), sda=Pin(14), freq=100000)
-mcp = mcp23017.MCP23017(i2c, 0x20)
+mcp = mcp23017.MCP23017(ui_bus, 0x20)
+
+# bus gebruik: imu_bus.report() / ui_bus.report()
 
 #limit switch module
 LIMIT_SWITCH_PIN = 26
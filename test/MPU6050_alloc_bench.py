@@ -0,0 +1,74 @@
+# Telt het aantal gealloceerde bytes per sample voor de verschillende MPU6050
+# lees-functies. Draait zonder sensor: de I2C bus wordt nagebootst.
+import gc
+import time
+from array import array
+from lib.MPU6050 import MPU6050
+
+# =====================================================
+# =============== NEP I2C BUS =========================
+# =====================================================
+
+class FakeI2C:
+    def __init__(self):
+        self.regs = bytearray(256)
+        # wat herkenbare meetwaarden vanaf ACCEL_XOUT_H (0x3B)
+        self.regs[0x3B:0x49] = bytes([0x01, 0x00, 0xFF, 0x00, 0x40, 0x00,
+                                      0xF2, 0x00,
+                                      0x00, 0x83, 0xFF, 0x7D, 0x00, 0x10])
+
+    def scan(self):
+        return [0x68]
+
+    def writeto_mem(self, addr, reg, data):
+        self.regs[reg] = data[0]
+
+    def readfrom_mem(self, addr, reg, n):
+        return bytes(self.regs[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        for i in range(len(buf)):
+            buf[i] = self.regs[reg + i]
+
+
+mpu = MPU6050(bus=FakeI2C())
+
+# =====================================================
+# =============== BENCHMARK ===========================
+# =====================================================
+
+SAMPLES = 200
+raw = array('h', [0] * 7)
+data = array('f', [0] * 7)
+
+def read_dicts():
+    mpu.read_accel_data()
+    mpu.read_gyro_data()
+
+def read_tuple():
+    mpu.read_all()
+
+def read_raw():
+    mpu.read_raw_into(raw)
+
+def read_floats():
+    mpu.read_all_into(data)
+
+def bench(name, fn):
+    fn()                       # eerste aanroep buiten de meting
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    start = time.ticks_us()
+    for _ in range(SAMPLES):
+        fn()
+    duration = time.ticks_diff(time.ticks_us(), start)
+    allocated = gc.mem_alloc() - before
+    gc.enable()
+    print("{:<22} {:>8.1f} bytes/sample {:>10.1f} us/sample".format(
+        name, allocated / SAMPLES, duration / SAMPLES))
+
+bench("accel+gyro dicts", read_dicts)   # bevat 2x 10 ms sleep per sample
+bench("read_all() tuple", read_tuple)
+bench("read_raw_into()", read_raw)
+bench("read_all_into()", read_floats)
@@ -1,15 +1,18 @@
-from lib.as5048a import AS5048A
+from machine import Pin, SPI
+from lib.as5048a import AS5048A, AS5048ASampler
 import time
 
-# SPI1, maar SPI0 mag ook (dan pinnen aanpassen)
-as5048 = AS5048A(
-    spi_id=0,
-    sck=2, mosi=3, miso=0, cs_pin=1
-)
+# SPI0, maar SPI1 mag ook (dan pinnen aanpassen)
+spi = SPI(0, baudrate=3000000, polarity=1, phase=1, sck=Pin(2), mosi=Pin(3), miso=Pin(0))
+as5048 = AS5048A(spi=spi, cs_pin=1)
+
+# 1 kHz uitlezen via timer, per 10 samples gemiddeld → 100 samples/sec
+sampler = AS5048ASampler(as5048, rate_hz=1000, decimate=10)
+sampler.start()
 
 while True:
-    data = as5048.read_all()
-    print(data["angle_deg"])
+    sampler.process()  # verwerk alle samples sinds de vorige keer
+    print(as5048.angle_deg, as5048.velocity_dps)
     time.sleep(0.1)
 
 from stepper import Stepper